@@ -0,0 +1,2337 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import bpy
+import os.path
+import re
+import math
+import json
+from collections import defaultdict
+from bpy.props import *
+from bpy.app.handlers import persistent
+from mathutils import Vector    
+from . bands import frequence_ranges, band_set_types, create_band_set
+from . profiling import profiler
+
+# the analysis and drawing modules are imported when they are used
+# for the first time to keep the startup of Blender fast
+
+frequence_range_dict = {frequence_range[0]: frequence_range[1] for frequence_range in frequence_ranges} 
+frequence_range_items = [(frequence_range[0], frequence_range[0], "") for frequence_range in frequence_ranges]
+
+bake_storage_items = [
+    ("FCURVE", "FCurves", "Keep every baked band as fcurve"),
+    ("FLOAT32", "Packed Float32", "Store the baked bands as compressed buffers, fcurves are only created for used bands"),
+    ("FLOAT16", "Packed Float16", "Like Float32 with half precision and half the size"),
+    ("CACHE", "Cache Files", "Store the baked bands in files next to the .blend file, undo steps only remember the file names") ]
+bake_method_items = [
+    ("SOUND_BAKE", "Blender", "Values of the sound bake of Blender"),
+    ("FILTER", "Filter", "One band pass filter per band computed by this addon"),
+    ("SPECTRUM", "Spectrum", "All bands of a band set from one spectrum"),
+    ("EXTERNAL", "External", "Values of a sidecar file that has been written by another program") ]
+packed_type_items = [(identifier, name, "") for identifier, name, description in bake_storage_items if identifier.startswith("FLOAT")]
+cache_directory_name = "audio_to_markers_cache"
+
+copied_keyframe_locations = []
+running_background_bakes = []
+processed_values_cache = {}
+bake_data_path_pattern = re.compile(r"audio_to_markers\.bake_data\[(\d+)\]\.intensity$")
+
+
+def apply_frequence_range(self, context):
+    settings = context.scene.audio_to_markers
+    settings.low_frequence, settings.high_frequence = frequence_range_dict[settings.frequence_range]
+        
+def frequence_range_changed(self, context):
+    update_fcurve_visibility()
+        
+def update_fcurve_visibility(self = None, context = None):
+    from . import drivers
+    update_bake_storage()
+    drivers.clear_loaded_bands()
+    fcurves = get_bake_data_fcurves()
+    settings = bpy.context.scene.audio_to_markers
+    for fcurve in fcurves:
+        fcurve.hide = settings.hide_unused_fcurves
+        fcurve.lock = settings.lock_sound_fcurves
+        fcurve.select = False
+    fcurve = get_fcurve_from_current_settings()
+    if fcurve:
+        fcurve.select = True  
+        fcurve.hide = False          
+        
+# shows the result of the new processing settings on the fcurve,
+# fcurves are not replaced while background bakes write into them
+def processing_changed(self, context):
+    if is_background_bake_running(): return
+    index = get_bake_data_index_from_path(self.path_from_id() + ".intensity")
+    fcurve = get_fcurve_from_bake_data_index(index)
+    if fcurve:
+        if not has_stored_values(self):
+            pack_bake_fcurve(self, fcurve, "FLOAT32")
+        context.scene.animation_data.action.fcurves.remove(fcurve)
+    update_fcurve_visibility()
+    
+def is_background_bake_running():
+    return len(running_background_bakes) > 0
+    
+def enable_profiling_changed(self, context):
+    profiler.enabled = context.scene.audio_to_markers.enable_profiling
+    
+# the setting is saved in the file, but the profiler only knows it after the update
+@persistent
+def sync_profiling_handler(dummy):
+    profiler.enabled = bpy.context.scene.audio_to_markers.enable_profiling
+
+
+class SoundStripData(bpy.types.PropertyGroup):
+    sequence_name = StringProperty(name = "Name", default = "")
+    
+# belongs to the timeline marker with the same name on the rounded frame
+class MarkerTime(bpy.types.PropertyGroup):
+    frame = FloatProperty(name = "Frame", description = "Precise frame of the marker", default = 0)
+
+class BakeData(bpy.types.PropertyGroup):
+    intensity = FloatProperty(name = "Intensity", default = 0)
+    low = FloatProperty(name = "Low Frequency")
+    high = FloatProperty(name = "High Frequency")
+    path = StringProperty(name = "File Path", default = "")
+    sequence_name = StringProperty(name = "Sound Strip", description = "Name of the baked sound strip, empty when the file was baked directly", default = "")
+    is_mixdown = BoolProperty(name = "Is Mixdown", description = "The data has been baked from the mix of all sound strips", default = False)
+    bake_method = EnumProperty(name = "Bake Method", description = "How the values have been computed, data from older versions has been baked by Blender", items = bake_method_items, default = "SOUND_BAKE")
+    packed_values = StringProperty(name = "Packed Values", description = "Compressed buffer with one value per frame", default = "")
+    packed_type = EnumProperty(name = "Packed Type", items = packed_type_items, default = "FLOAT32")
+    packed_start_frame = IntProperty(name = "Packed Start Frame", description = "Frame of the first packed value", default = 0)
+    sidecar_path = StringProperty(name = "Sidecar Path", description = "Sidecar envelope file that contains the values of this data", default = "", subtype = "FILE_PATH")
+    is_cached = BoolProperty(name = "Is Cached", description = "The sidecar path is the name of a file in the cache directory of this file", default = False)
+    sidecar_band = IntProperty(name = "Sidecar Band", description = "Index of the band in the sidecar file", default = 0, min = 0)
+    use_processing = BoolProperty(name = "Process", description = "Smooth and shape the baked values, the original values are kept", default = False, update = processing_changed)
+    smoothing = FloatProperty(name = "Smoothing", description = "Width of the moving average in frames", default = 0, min = 0, update = processing_changed)
+    attack = FloatProperty(name = "Attack", description = "Frames to follow rising values", default = 0, min = 0, update = processing_changed)
+    release = FloatProperty(name = "Release", description = "Frames to follow falling values", default = 0, min = 0, update = processing_changed)
+    gate = FloatProperty(name = "Gate", description = "Values below the gate become zero", default = 0, min = 0, update = processing_changed)
+    compression_threshold = FloatProperty(name = "Threshold", description = "Values above the threshold are compressed", default = 1, min = 0, update = processing_changed)
+    compression_ratio = FloatProperty(name = "Ratio", description = "Compression ratio above the threshold", default = 1, min = 1, update = processing_changed)
+    normalize = BoolProperty(name = "Normalize", description = "Scale the values so that the highest one is 1", default = False, update = processing_changed)
+    use_fcurve = BoolProperty(name = "Use FCurve", description = "Keep a fcurve for this data even when it is packed, e.g. to drive other properties", default = False, update = update_fcurve_visibility)
+
+class AudioToMarkersSceneSettings(bpy.types.PropertyGroup):
+    path = StringProperty(name = "File Path", description = "Path of the music file", default = "")
+    sound_strips = CollectionProperty(name = "Music Strips", type = SoundStripData)
+    frequence_range = EnumProperty(name = "Frequence Range", items = frequence_range_items, default = "80 - 250 Hz", update = apply_frequence_range)
+    low_frequence = FloatProperty(name = "Low Frequence", default = 80, update = frequence_range_changed)
+    high_frequence = FloatProperty(name = "High Frequence", default = 250, update = frequence_range_changed)
+    bake_data = CollectionProperty(name = "Sound Bake Data", type = BakeData)
+    bake_info_text = StringProperty(name = "Info Text", default = "")
+    paste_keyframes_info_text = StringProperty(name = "Bake Keyframes Info Text", default = "")
+    hide_unused_fcurves = BoolProperty(name = "Hide Unused FCurves", description = "Show only the selected baked data", default = False, update = update_fcurve_visibility)
+    lock_sound_fcurves = BoolProperty(name = "Lock Sound Curves", description = "Prevent the user from changing sound fcurves", default = False, update = update_fcurve_visibility)
+    band_set_type = EnumProperty(name = "Band Set", description = "Frequence bands that are baked together", items = band_set_types, default = "LOGARITHMIC")
+    band_amount = IntProperty(name = "Bands", description = "Amount of bands in the band set", default = 32, min = 1, max = 256)
+    band_low_frequence = FloatProperty(name = "Low", description = "Lowest frequence of the band set", default = 20, min = 0)
+    band_high_frequence = FloatProperty(name = "High", description = "Highest frequence of the band set", default = 20000, min = 1)
+    custom_bands = StringProperty(name = "Custom Bands", description = "Comma separated list of frequence ranges, e.g. 0-100, 100-500, 500-20000", default = "0-100, 100-500, 500-20000")
+    bake_storage = EnumProperty(name = "Bake Storage", description = "How baked sound is stored in the file", items = bake_storage_items, default = "FCURVE", update = update_fcurve_visibility)
+    marker_times = CollectionProperty(name = "Marker Times", type = MarkerTime)
+    audition_latency = FloatProperty(name = "Latency", description = "Output latency of the sound card in seconds that is added to the measured latency when markers are tapped", default = 0, min = 0, max = 1, subtype = "TIME")
+    show_spectrogram = BoolProperty(name = "Spectrogram", description = "Show the spectrogram of the music file while inserting markers", default = False)
+    enable_profiling = BoolProperty(name = "Profiling", description = "Measure the time spent in the operators of this addon", default = False, update = enable_profiling_changed)
+ 
+ 
+ 
+ 
+# Sound Bake
+############################################### 
+ 
+class AudioManagerPanel(bpy.types.Panel):
+    bl_idname = "audio_manager_panel"
+    bl_label = "Bake Audio"
+    bl_space_type = "GRAPH_EDITOR"
+    bl_region_type = "UI"
+    
+    def draw(self, context):
+        layout = self.layout
+        settings = context.scene.audio_to_markers
+        
+        col = layout.column(align = False)
+        
+        row = col.row(align = True)
+        row.prop(settings, "path", text = "Sound")
+        row.operator("audio_to_markers.select_music_file", icon = "FILE_SOUND", text = "")
+        
+        if settings.path != "":
+            row = col.row(align = True)
+            row.operator("audio_to_markers.cache_sounds", icon = "LOAD_FACTORY", text = "")
+            row.operator("audio_to_markers.load_into_sequence_editor", text = "Load Sound")
+            row.operator("audio_to_markers.remove_sound_strips", icon = "X", text = "")
+            
+            col = layout.column(align = False)
+            
+            subcol = col.column(align = True)
+            subcol.prop(settings, "frequence_range", text = "")  
+            subcol.prop(settings, "low_frequence", text = "Low")
+            subcol.prop(settings, "high_frequence", text = "High")
+              
+            subcol.operator("audio_to_markers.bake_sound_in_background", text = "Bake", icon = "RNDCURVE")
+            
+            row = col.row(align = True)
+            if settings.hide_unused_fcurves: row.prop(settings, "hide_unused_fcurves", text = "", icon = "RESTRICT_VIEW_ON")
+            else: row.prop(settings, "hide_unused_fcurves", text = "", icon = "RESTRICT_VIEW_OFF")
+            
+            if settings.lock_sound_fcurves: row.prop(settings, "lock_sound_fcurves", text = "", icon = "LOCKED")
+            else: row.prop(settings, "lock_sound_fcurves", text = "", icon = "UNLOCKED")
+            
+            props = row.operator("audio_to_markers.bake_sound_in_background", text = "Bake All Frequences")
+            props.bake_all_frequence_ranges = True
+            row.operator("audio_to_markers.remove_bake_data", icon = "X", text = "")
+            
+            row = col.row(align = True)
+            row.prop(settings, "bake_storage", text = "")
+            row.operator("audio_to_markers.export_sidecar", icon = "EXPORT", text = "")
+            row.operator("audio_to_markers.link_sidecar", icon = "LINK_BLEND", text = "")
+            if settings.bake_storage == "CACHE":
+                row.operator("audio_to_markers.remove_unused_cache_files", icon = "TRASH", text = "")
+                if not can_use_cache_files():
+                    col.label("Packed until the file is saved", icon = "INFO")
+            box = col.box()
+            box.prop(settings, "band_set_type", text = "")
+            if settings.band_set_type == "CUSTOM":
+                box.prop(settings, "custom_bands", text = "")
+            elif settings.band_set_type != "DEFAULT":
+                subcol = box.column(align = True)
+                subcol.prop(settings, "band_amount")
+                subcol.prop(settings, "band_low_frequence")
+                subcol.prop(settings, "band_high_frequence")
+            props = box.operator("audio_to_markers.bake_sound_in_background", text = "Bake Band Set", icon = "SEQ_HISTOGRAM")
+            props.bake_band_set = True
+            
+            item = get_current_bake_item()
+            if item:
+                box = col.box()
+                box.enabled = not is_background_bake_running()
+                box.prop(item, "use_processing")
+                if item.use_processing:
+                    subcol = box.column(align = True)
+                    subcol.prop(item, "smoothing")
+                    subcol.prop(item, "attack")
+                    subcol.prop(item, "release")
+                    subcol = box.column(align = True)
+                    subcol.prop(item, "gate")
+                    subcol.prop(item, "compression_threshold")
+                    subcol.prop(item, "compression_ratio")
+                    box.prop(item, "normalize")
+            
+            if settings.bake_storage != "FCURVE" and len(settings.bake_data) > 0:
+                box = col.box()
+                box.label("Keep FCurves:")
+                subcol = box.column(align = True)
+                for item in settings.bake_data:
+                    subcol.prop(item, "use_fcurve", text = get_bake_item_label(item))
+                
+        row = col.row(align = True)
+        row.operator("audio_to_markers.bake_sound_strips", icon = "SEQUENCE")
+        row.operator("audio_to_markers.bake_mixdown")
+        
+        if settings.bake_info_text != "":
+            layout.label(settings.bake_info_text)
+            
+          
+        layout.separator()
+          
+            
+        col = layout.column(align = False)
+        selected_fcurves_amount = len(get_active_fcurves())
+        row = col.row(align = True)
+        row.operator("graph.bake", text = "Bake")
+        row.operator("audio_to_markers.unbake_fcurves", text = "Unbake")
+        
+        subcol = col.column(align = True)
+        
+        source = CopyBakedFCurveData.get_source_fcurve(return_owner = True)
+        if source: copy_text = "Copy from {}.{}[{}]".format(source[0].name, source[1].data_path, source[1].array_index)   
+        else: copy_text = "No Copy Source Selected"
+        subcol.operator("audio_to_markers.copy_baked_fcurve_data", text = copy_text, icon = "COPYDOWN")   
+        
+        target_amount = PasteCopiedBakedFCurveData.get_target_amount()
+        if len(copied_keyframe_locations) == 0: paste_text = "No Copied Data"
+        elif target_amount == 0: paste_text = "No Target Selected"
+        elif target_amount == 1: paste_text = "Paste on 1 FCurve"
+        else: paste_text = "Paste on {} FCurves".format(target_amount)      
+        subcol.operator("audio_to_markers.paste_copied_baked_fcurve_data", text = paste_text, icon = "PASTEDOWN")
+        
+        if settings.paste_keyframes_info_text != "":
+            layout.label(settings.paste_keyframes_info_text)
+            
+            
+        layout.separator()
+            
+            
+        col = layout.column(align = False)
+        row = col.row(align = True) 
+        row.operator("audio_to_markers.manual_marker_insertion", icon = "MARKER_HLT")    
+        row.operator("audio_to_markers.import_markers", icon = "IMPORT", text = "")
+        row.operator("audio_to_markers.export_markers", icon = "EXPORT", text = "")
+        row.operator("audio_to_markers.remove_all_markers", icon = "X", text = "")
+        row = col.row(align = True)
+        row.prop(settings, "show_spectrogram")
+        row.prop(settings, "audition_latency")
+        
+        
+        layout.separator()
+        
+        
+        col = layout.column(align = True)
+        col.prop(settings, "enable_profiling")
+        if settings.enable_profiling:
+            for name, amount, duration, counters in profiler.get_summary():
+                text = "{}: {} x, {:.2f} ms".format(name, amount, duration * 1000)
+                for counter_name, value in sorted(counters.items()):
+                    text += ", {} {}".format(value, counter_name)
+                col.label(text)
+            row = col.row(align = True)
+            row.operator("audio_to_markers.export_profile", icon = "EXPORT")
+            row.operator("audio_to_markers.clear_profile", icon = "X", text = "")
+        
+        
+        
+class SelectMusicFile(bpy.types.Operator):
+    bl_idname = "audio_to_markers.select_music_file"
+    bl_label = "Select Music File"
+    bl_description = "Select a music file with the File Selector"
+    bl_options = {"REGISTER", "INTERNAL"}
+    
+    filepath = StringProperty(subtype = "FILE_PATH")
+    
+    @classmethod
+    def poll(cls, context):
+        return True
+    
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+    
+    def execute(self, context):
+        context.scene.audio_to_markers.path = self.filepath
+        return {"FINISHED"}
+             
+             
+class LoadIntoSequenceEditor(bpy.types.Operator):
+    bl_idname = "audio_to_markers.load_into_sequence_editor"
+    bl_label = "Load into Sequence Editor"
+    bl_description = "Add a sound strip into the sequence editor at the start frame (hold alt to insert at current frame)"
+    bl_options = {"REGISTER", "INTERNAL"}
+    
+    @classmethod
+    def poll(cls, context):
+        return True
+    
+    def invoke(self, context, event):
+        scene = context.scene
+        path = scene.audio_to_markers.path
+        name = os.path.basename(path)
+        frame = scene.frame_current if event.alt else scene.frame_start
+        
+        if not scene.sequence_editor:
+            scene.sequence_editor_create()
+        channel = self.get_empty_channel(scene)
+        sequence = context.scene.sequence_editor.sequences.new_sound(name = name, filepath = path, frame_start = frame, channel = channel)
+        scene.frame_end = scene.frame_start + sequence.frame_duration
+        item = scene.audio_to_markers.sound_strips.add()
+        item.sequence_name = sequence.name
+        return {"FINISHED"}
+    
+    def get_empty_channel(self, scene):
+        used_channels = [sequence.channel for sequence in scene.sequence_editor.sequences]
+        for channel in range(1, 32):
+            if not channel in used_channels:
+                return channel
+        return 0
+                  
+
+class CacheSounds(bpy.types.Operator):
+    bl_idname = "audio_to_markers.cache_sounds"
+    bl_label = "Cache Sounds"
+    bl_description = "Load all sounds into RAM"
+    bl_options = {"REGISTER"}
+    
+    @classmethod
+    def poll(cls, context):
+        return True
+    
+    def execute(self, context):
+        path = context.scene.audio_to_markers.path
+        for sound in bpy.data.sounds:
+            if sound.filepath ==  path and not sound.use_memory_cache:
+                sound.use_memory_cache = True
+        return {"FINISHED"}
+                     
+        
+class RemoveSoundStrips(bpy.types.Operator):
+    bl_idname = "audio_to_markers.remove_sound_strips"
+    bl_label = "Remove Sound Strips"
+    bl_description = "Remove all sound strips which were created with this addon"
+    bl_options = {"REGISTER", "INTERNAL"}
+    
+    @classmethod
+    def poll(cls, context):
+        return True
+    
+    def execute(self, context):
+        scene = context.scene
+        if not scene.sequence_editor:
+            return {"CANCELLED"}
+        sequences = scene.sequence_editor.sequences
+        sounds = []
+        for item in context.scene.audio_to_markers.sound_strips:
+            sequence = sequences.get(item.sequence_name)
+            if sequence:
+                sounds.append(sequence.sound)
+                sequences.remove(sequence)
+        for sound in sounds:
+            sound.use_memory_cache = False
+        return {"FINISHED"}
+          
+          
+class BakeAllFrequenceRanges(bpy.types.Operator):
+    bl_idname = "audio_to_markers.bake_all_frequence_ranges"
+    bl_label = "Bake All Frequences"
+    bl_description = "Bake All Frequence Ranges"
+    bl_options = {"REGISTER", "INTERNAL", "UNDO"}
+    
+    @classmethod
+    def poll(cls, context):
+        return not is_background_bake_running()
+        
+    def modal(self, context, event):
+        if event.type in ["MIDDLEMOUSE", "WHEELDOWNMOUSE", "WHEELUPMOUSE"]: return {"PASS_THROUGH"}
+        
+        if self.progress_index == len(frequence_ranges) or event.type == "ESC":
+            bpy.context.area.tag_redraw()
+            self.cancel(context)
+            return {"FINISHED"}
+        
+        self.counter += 1
+        if event.type == "TIMER" and self.counter % 30 == 0:
+            self.settings.bake_info_text = "Bake: {} of {}".format(self.progress_index+1, len(frequence_ranges))
+            context.area.tag_redraw()
+            
+            if self.progress_index == -1:
+                self.progress_index = 0
+                return {"RUNNING_MODAL"}
+            
+            self.settings.low_frequence, self.settings.high_frequence = frequence_ranges[self.progress_index][1]
+            bpy.ops.audio_to_markers.bake_sound()
+            self.progress_index += 1
+        return {"RUNNING_MODAL"}
+    
+    def invoke(self, context, event):
+        context.window_manager.modal_handler_add(self)
+        self.progress_index = -1
+        self.counter = 0
+        self.settings = context.scene.audio_to_markers
+        self.timer = context.window_manager.event_timer_add(0.001, context.window)
+        return {"RUNNING_MODAL"}
+    
+    def cancel(self, context):
+        context.window_manager.event_timer_remove(self.timer)
+        self.settings.bake_info_text = ""
+        
+            
+class BakeSound(bpy.types.Operator):
+    bl_idname = "audio_to_markers.bake_sound"
+    bl_label = "Bake Sound"
+    bl_description = "Bake sound on selected fcurves (hold alt to bake from current frame)"
+    bl_options = {"REGISTER", "INTERNAL", "UNDO"}
+    
+    bake_from_start_frame = BoolProperty(default = True)
+    
+    @classmethod
+    def poll(cls, context):
+        return not is_background_bake_running()
+    
+    def invoke(self, context, event):
+        self.bake_from_start_frame = not event.alt
+        self.execute(context)
+        return {"FINISHED"}
+    
+    def execute(self, context):
+        scene = context.scene
+        settings = scene.audio_to_markers
+        self.low = settings.low_frequence
+        self.high = settings.high_frequence
+        self.path = settings.path
+        
+        frame_before = scene.frame_current
+        if self.bake_from_start_frame:
+            scene.frame_current = scene.frame_start
+
+        with profiler.span("Bake Sound") as span:
+            with profiler.span("Prepare FCurve"):
+                fcurve = create_item_and_fcurve_from_current_settings()
+                settings.bake_data[get_bake_data_index_from_fcurve(fcurve)].bake_method = "SOUND_BAKE"
+                only_select_fcurve(fcurve)
+            try:
+                fcurve.lock = False
+                # decoding, filtering and writing the fcurve happen in one call
+                with profiler.span("Decode, Filter and Write FCurve"):
+                    bpy.ops.graph.sound_bake(
+                        filepath = self.path,
+                        low = self.low,
+                        high = self.high)
+            except Exception as e:
+                scene.frame_current = frame_before
+                self.report({"ERROR"}, "Could not bake the file: {}".format(e))
+                return {"CANCELLED"}
+            span.add("Samples", len(fcurve.sampled_points))
+        scene.frame_current = frame_before
+        update_fcurve_visibility()
+        return {"FINISHED"}
+    
+    
+# the operator has to set self.settings, self.targets, self.backups and self.job and call start_job
+class BackgroundBake:
+    def start_job(self, context):
+        running_background_bakes.append(self)
+        self.job.start()
+        self.timer = context.window_manager.event_timer_add(0.05, context.window)
+        context.window_manager.modal_handler_add(self)
+        update_fcurve_visibility()
+        return {"RUNNING_MODAL"}
+    
+    # the old values of the item stay in the backup until the job is done,
+    # so cancelling a bake does not replace a complete bake with a part of it
+    def create_target_fcurve(self, path, low, high, sequence_name = "", is_mixdown = False, bake_method = "FILTER"):
+        index = get_bake_item_index(path, low, high, sequence_name, is_mixdown)
+        backup = backup_bake_item(index) if index != -1 else None
+        if backup is not None: self.backups[index] = backup
+        return create_empty_bake_fcurve(path, low, high, sequence_name, is_mixdown, bake_method)
+    
+    def modal(self, context, event):
+        # the bake has already been cancelled before an undo step or loading a file
+        if self not in running_background_bakes: return {"CANCELLED"}
+        if event.type == "ESC":
+            self.cancel(context)
+            return {"CANCELLED"}
+        if event.type != "TIMER": return {"PASS_THROUGH"}
+        
+        self.apply_finished_chunks()
+        if self.job.error is not None:
+            self.report({"ERROR"}, "Could not bake the file: {}".format(self.job.error))
+            self.cancel(context)
+            return {"CANCELLED"}
+        if self.job.is_done:
+            self.cancel(context)
+            return {"FINISHED"}
+        
+        self.settings.bake_info_text = "Bake: {:.0f}%".format(self.job.progress * 100)
+        context.area.tag_redraw()
+        return {"PASS_THROUGH"}
+    
+    def apply_finished_chunks(self):
+        changed_targets = set()
+        for path_index, band_index, first_frame, values in self.job.get_finished_chunks():
+            for target in self.targets.get((path_index, band_index), []):
+                target.add_values(first_frame, values)
+                changed_targets.add(target)
+        
+        with profiler.span("Write FCurve") as span:
+            for target in changed_targets:
+                target.write()
+                span.add("Keyframes", len(target.locations) // 2)
+            
+    # Blender calls this too when it removes the modal handler, e.g. when a file is loaded
+    def cancel(self, context):
+        if self not in running_background_bakes: return
+        running_background_bakes.remove(self)
+        is_complete = self.job.is_done and self.job.error is None
+        self.job.cancel()
+        context.window_manager.event_timer_remove(self.timer)
+        for targets in self.targets.values():
+            for target in targets:
+                target.convert_to_samples()
+        if not is_complete:
+            for index, backup in self.backups.items():
+                restore_bake_item(index, *backup)
+        update_fcurve_visibility()
+        self.settings.bake_info_text = ""
+        if context.area: context.area.tag_redraw()
+        
+# undo, redo and loading a file free the fcurves of the targets,
+# so the bakes stop while the fcurves still exist
+@persistent
+def cancel_background_bakes_handler(dummy):
+    for operator in list(running_background_bakes):
+        operator.cancel(bpy.context)
+        
+        
+# writes the values of one envelope into a fcurve,
+# values outside of the frame range are ignored
+class BakeTarget:
+    def __init__(self, fcurve, start_frame, volume = 1.0, frame_range = None):
+        self.fcurve = fcurve
+        self.start_frame = start_frame
+        self.volume = volume
+        self.frame_range = frame_range
+        self.locations = []
+        
+    def add_values(self, first_frame, values):
+        for i, value in enumerate(values.tolist()):
+            frame = self.start_frame + first_frame + i
+            if self.frame_range is None or self.frame_range[0] <= frame < self.frame_range[1]:
+                self.locations.extend((frame, value * self.volume))
+                
+    def write(self):
+        keyframe_points = self.fcurve.keyframe_points
+        keyframe_points.add(len(self.locations) // 2 - len(keyframe_points))
+        keyframe_points.foreach_set("co", self.locations)
+        self.fcurve.update()
+        
+    # sampled points are much smaller than keyframes and can be unbaked later
+    def convert_to_samples(self):
+        if len(self.locations) > 0:
+            self.fcurve.convert_to_samples(self.locations[0], self.locations[-2])
+    
+        
+class BakeSoundInBackground(bpy.types.Operator, BackgroundBake):
+    bl_idname = "audio_to_markers.bake_sound_in_background"
+    bl_label = "Bake Sound"
+    bl_description = "Bake sound without blocking Blender, ESC cancels (hold alt to bake from current frame)"
+    bl_options = {"REGISTER", "INTERNAL", "UNDO"}
+    
+    bake_all_frequence_ranges = BoolProperty(default = False)
+    bake_band_set = BoolProperty(default = False)
+    
+    @classmethod
+    def poll(cls, context):
+        return not is_background_bake_running()
+    
+    def invoke(self, context, event):
+        from . import decoding
+        from . baking import BakeJob
+        scene = context.scene
+        self.settings = scene.audio_to_markers
+        path = bpy.path.abspath(self.settings.path)
+        
+        # Blender can bake more file formats than the decoder of this addon
+        if not decoding.can_read(path):
+            if self.bake_band_set:
+                self.report({"ERROR"}, "Band sets can only be baked from files the addon can decode")
+                return {"CANCELLED"}
+            if self.bake_all_frequence_ranges: return bpy.ops.audio_to_markers.bake_all_frequence_ranges("INVOKE_DEFAULT")
+            else: return bpy.ops.audio_to_markers.bake_sound("INVOKE_DEFAULT")
+        
+        method = "FILTER"
+        if self.bake_band_set:
+            try: bands = get_band_set(self.settings)
+            except ValueError as e:
+                self.report({"ERROR"}, str(e))
+                return {"CANCELLED"}
+            method = "SPECTRUM"
+        elif self.bake_all_frequence_ranges: bands = [frequence_range[1] for frequence_range in frequence_ranges]
+        else: bands = [(self.settings.low_frequence, self.settings.high_frequence)]
+        
+        start_frame = scene.frame_current if event.alt else scene.frame_start
+        self.targets = {}
+        self.backups = {}
+        for band_index, (low, high) in enumerate(bands):
+            fcurve = self.create_target_fcurve(self.settings.path, low, high, bake_method = method)
+            self.targets[(0, band_index)] = [BakeTarget(fcurve, start_frame)]
+        self.job = BakeJob([path], bands, scene.render.fps / scene.render.fps_base, method = method)
+        return self.start_job(context)
+    
+    
+class BakeSoundStrips(bpy.types.Operator, BackgroundBake):
+    bl_idname = "audio_to_markers.bake_sound_strips"
+    bl_label = "Bake All Strips"
+    bl_description = "Bake all frequence ranges of every unmuted sound strip in the sequence editor, ESC cancels"
+    bl_options = {"REGISTER", "INTERNAL", "UNDO"}
+    
+    @classmethod
+    def poll(cls, context):
+        return not is_background_bake_running() and len(get_sound_strips(context.scene)) > 0
+    
+    def invoke(self, context, event):
+        from . import decoding
+        from . baking import BakeJob
+        self.settings = context.scene.audio_to_markers
+        bands = [frequence_range[1] for frequence_range in frequence_ranges]
+        
+        # every file is decoded only once, even when it is used by many strips
+        paths = []
+        path_indices = {}
+        self.targets = defaultdict(list)
+        self.backups = {}
+        skipped_strips = []
+        for sequence in get_sound_strips(context.scene):
+            path = os.path.normpath(bpy.path.abspath(sequence.sound.filepath))
+            if not decoding.can_read(path):
+                skipped_strips.append(sequence.name)
+                continue
+            if path not in path_indices:
+                path_indices[path] = len(paths)
+                paths.append(path)
+            frame_range = (sequence.frame_final_start, sequence.frame_final_end)
+            for band_index, (low, high) in enumerate(bands):
+                fcurve = self.create_target_fcurve(sequence.sound.filepath, low, high, sequence.name)
+                target = BakeTarget(fcurve, sequence.frame_start, sequence.volume, frame_range)
+                self.targets[(path_indices[path], band_index)].append(target)
+                
+        if len(skipped_strips) > 0:
+            self.report({"WARNING"}, "Cannot decode: {}".format(", ".join(skipped_strips)))
+        if len(paths) == 0:
+            return {"CANCELLED"}
+        scene = context.scene
+        self.job = BakeJob(paths, bands, scene.render.fps / scene.render.fps_base)
+        return self.start_job(context)
+    
+    
+class BakeMixdown(bpy.types.Operator, BackgroundBake):
+    bl_idname = "audio_to_markers.bake_mixdown"
+    bl_label = "Bake Mixdown"
+    bl_description = "Bake all frequence ranges of the mix of all unmuted sound strips as they are placed in the sequence editor, ESC cancels"
+    bl_options = {"REGISTER", "INTERNAL", "UNDO"}
+    
+    @classmethod
+    def poll(cls, context):
+        return not is_background_bake_running() and len(get_sound_strips(context.scene)) > 0
+    
+    def invoke(self, context, event):
+        from . import decoding
+        from . baking import MixdownJob
+        scene = context.scene
+        self.settings = scene.audio_to_markers
+        fps = scene.render.fps / scene.render.fps_base
+        bands = [frequence_range[1] for frequence_range in frequence_ranges]
+        
+        sequences = []
+        for sequence in get_sound_strips(scene):
+            if decoding.can_read(bpy.path.abspath(sequence.sound.filepath)): sequences.append(sequence)
+            else: self.report({"WARNING"}, "Cannot decode: {}".format(sequence.name))
+        if len(sequences) == 0:
+            return {"CANCELLED"}
+        
+        start_frame = min(sequence.frame_final_start for sequence in sequences)
+        end_frame = max(sequence.frame_final_end for sequence in sequences)
+        strips = []
+        for sequence in sequences:
+            strips.append((
+                os.path.normpath(bpy.path.abspath(sequence.sound.filepath)),
+                (sequence.frame_start - start_frame) / fps,
+                (sequence.frame_final_start - start_frame) / fps,
+                (sequence.frame_final_end - start_frame) / fps,
+                sequence.volume))
+        
+        self.targets = {}
+        self.backups = {}
+        for band_index, (low, high) in enumerate(bands):
+            fcurve = self.create_target_fcurve("", low, high, is_mixdown = True)
+            self.targets[(0, band_index)] = [BakeTarget(fcurve, start_frame)]
+            
+        self.job = MixdownJob(strips, bands, fps, (end_frame - start_frame) / fps)
+        return self.start_job(context)
+    
+    
+class RemoveBakeData(bpy.types.Operator):
+    bl_idname = "audio_to_markers.remove_bake_data"
+    bl_label = "Remove Bake Data"
+    bl_description = "Remove baked sound"
+    bl_options = {"REGISTER", "INTERNAL", "UNDO"}
+    
+    @classmethod
+    def poll(cls, context):
+        return not is_background_bake_running()
+    
+    def execute(self, context):
+        try:    
+            fcurves = context.scene.animation_data.action.fcurves
+            for fcurve in fcurves:
+                if fcurve.data_path.startswith("audio_to_markers.bake_data"):
+                    fcurves.remove(fcurve)
+        except: pass
+        context.scene.audio_to_markers.bake_data.clear()
+        update_fcurve_visibility()
+        context.area.tag_redraw()
+        return {"FINISHED"}
+        
+        
+  
+
+# Create Markers
+################################################  
+
+     
+class ManualMarkerInsertion(bpy.types.Operator):
+    bl_idname = "audio_to_markers.manual_marker_insertion"
+    bl_label = "Insert Markers"
+    bl_description = ""
+    bl_options = {"REGISTER"}
+    
+    @classmethod
+    def poll(cls, context):
+        return get_active_fcurve()
+        
+    def invoke(self, context, event):
+        from . drawing import Rectangle
+        self.setup_event_manager()
+        
+        self.mouse_down_position = get_mouse_position(event)
+        self.is_left_mouse_down = False
+        self.is_right_mouse_down = False
+        self.insertion_preview_data = []
+        
+        self.selection_type = "NONE"
+        self.selection = Rectangle()
+        self.selection.top = 10000
+        self.selection.bottom = -10000
+        self.selection.color = (1.0, 0.1, 0.1, 0.2)
+        self.selection.border_color = (0.8, 0.2, 0.1, 0.6)
+        self.selection.border_thickness = 2
+        self.fcurve = get_active_fcurve()
+        self.audition = None
+        self.visible_spectrogram_tiles = []
+        self.spectrogram_view = None
+        
+        args = (self, context)
+        self._handle = bpy.types.SpaceGraphEditor.draw_handler_add(self.draw_callback_px, args, "WINDOW", "POST_PIXEL")
+        context.window_manager.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+    
+    def setup_event_manager(self):
+        self.manager = EventManager()
+        self.key_bindings = get_key_bindings()
+        for action, event_type, event_value, shift, ctrl, alt in self.key_bindings:
+            self.manager.add_event(action, EventSettings(event_type, event_value, shift, ctrl, alt))
+        self.event_name = None
+    
+    def cancel(self, context):
+        from . import drawing
+        self.stop_audition(context)
+        bpy.types.SpaceGraphEditor.draw_handler_remove(self._handle, "WINDOW")
+        drawing.free_spectrogram_textures()
+        
+    def modal(self, context, event):
+        self.fcurve = get_active_fcurve()
+        # the handlers use the name that is resolved once per event
+        self.event_name = self.manager.get_name(event)
+        
+        # finish events
+        if not self.fcurve:
+            self.cancel(context)
+            return {"FINISHED"}
+        if self.event_name == "FINISH": 
+            self.cancel(context)
+            return {"FINISHED"}
+        
+        # pass through events
+        if self.event_name == "PASS_THROUGH":
+            return {"PASS_THROUGH"}
+       
+        self.marked_frames = get_marked_frames()
+        self.snap_location, snap_frame = self.get_snapping_result(event)
+        self.insertion_preview_data = [(self.snap_location, snap_frame not in self.marked_frames)]
+        self.selection.right = event.mouse_region_x 
+        
+        self.update_mouse_press_status(event)
+               
+        self.play_or_pause_animation_handler(event)  
+        self.audition_handler(context, event)
+        self.insert_marker_handler(event, snap_frame)
+        self.remove_markers_handler(event)
+        self.insert_multiple_markers_handler(event)
+        
+        if self.event_name == "FULLSCREEN" and self.is_mouse_inside(event, context.area):
+            bpy.ops.screen.screen_full_area()
+            return {"RUNNING_MODAL"}
+        
+        context.area.tag_redraw()    
+        
+        if self.is_mouse_inside(event, context.region) or self.is_left_mouse_down or self.is_right_mouse_down:
+            return {"RUNNING_MODAL"}
+        else:
+            return {"PASS_THROUGH"}
+        
+    def update_mouse_press_status(self, event):
+        if event.type == "LEFTMOUSE":
+            if event.value == "PRESS" and self.is_mouse_inside(event, bpy.context.region):
+                self.mouse_down_position = get_mouse_position(event)
+                self.is_left_mouse_down = True
+            if event.value == "RELEASE":
+                self.is_left_mouse_down = False
+                
+        if event.type == "RIGHTMOUSE":
+            if event.value == "PRESS" and self.is_mouse_inside(event, bpy.context.region):
+                self.mouse_down_position = get_mouse_position(event)
+                self.is_right_mouse_down = True
+            if event.value == "RELEASE":
+                self.is_right_mouse_down = False  
+            
+    def play_or_pause_animation_handler(self, event):
+        if self.event_name == "PLAY_PAUSE":
+            bpy.ops.screen.animation_play()
+        if self.event_name == "PLAY_PAUSE_RESET":
+            if not bpy.context.screen.is_animation_playing:
+                frame = bpy.context.region.view2d.region_to_view(event.mouse_region_x, 0)[0]
+                bpy.context.scene.frame_current = frame
+            bpy.ops.screen.animation_play()
+            
+    def audition_handler(self, context, event):
+        name = self.event_name
+        if name == "AUDITION":
+            if self.audition is None: self.start_audition(context, event)
+            else: self.stop_audition(context)
+        elif self.audition is not None:
+            if not self.audition.is_playing:
+                self.stop_audition(context)
+            elif name == "TAP":
+                insert_precise_markers([self.get_audition_frame()])
+            elif event.type == "TIMER":
+                context.scene.frame_current = int(self.get_audition_frame())
+            
+    # plays the music file without the animation playback, so that tapped markers
+    # get the time from the audio clock even when the scene drops frames
+    def start_audition(self, context, event):
+        from . import audition
+        scene = context.scene
+        settings = scene.audio_to_markers
+        path = bpy.path.abspath(settings.path)
+        if not os.path.isfile(path):
+            self.report({"WARNING"}, "Cannot find the music file")
+            return
+        
+        if self.is_mouse_inside(event, context.region): frame = self.get_frame_under_region_x(event.mouse_region_x)
+        else: frame = scene.frame_current
+        self.audition_fps = scene.render.fps / scene.render.fps_base
+        self.audition_start_frame = self.get_audio_start_frame()
+        self.audition = audition.create_device(settings.audition_latency)
+        self.audition.play(path, max(frame - self.audition_start_frame, 0) / self.audition_fps)
+        self.audition_timer = context.window_manager.event_timer_add(0.01, context.window)
+        
+    def stop_audition(self, context):
+        if self.audition is None: return
+        self.audition.stop()
+        self.audition = None
+        context.window_manager.event_timer_remove(self.audition_timer)
+        
+    def get_audition_frame(self):
+        return self.audition_start_frame + self.audition.get_time() * self.audition_fps
+        
+    def get_audio_start_frame(self):
+        return get_sound_start_frame(self.fcurve)
+            
+    def is_mouse_over_side_bars(self, event):
+        return self.is_mouse_inside(event, bpy.context.area) and \
+            not self.is_mouse_inside(event, bpy.context.region)
+            
+    def insert_marker_handler(self, event, snap_frame):
+        if self.selection_type != "NONE" or event.alt or event.ctrl: return
+        if event.type == "LEFTMOUSE" and event.value == "RELEASE":
+            if self.is_mouse_inside(event, bpy.context.region):
+                insert_markers([snap_frame])
+                
+    def remove_markers_handler(self, event): 
+        if self.selection_type == "INSERT": return
+        if self.is_right_mouse_down and (get_mouse_position(event)-self.mouse_down_position).length > 14:
+            self.selection_type = "REMOVE"
+            self.selection.left = self.mouse_down_position.x
+            self.selection.right = event.mouse_region_x
+        if self.selection_type == "REMOVE" and not self.is_right_mouse_down:
+            self.selection_type = "NONE"
+            start_frame = self.get_frame_under_region_x(self.selection.left)
+            end_frame = self.get_frame_under_region_x(self.selection.right)
+            remove_markers(start_frame, end_frame)
+                
+    def insert_multiple_markers_handler(self, event):
+        if self.selection_type == "REMOVE" or event.alt or event.ctrl or event.shift: return
+        if self.is_left_mouse_down and (get_mouse_position(event)-self.mouse_down_position).length > 14:
+            self.selection_type = "INSERT"
+            self.selection.left = self.mouse_down_position.x
+            self.selection.right = event.mouse_region_x
+        if self.selection_type == "INSERT":
+            threshold = self.get_view_y_under_region_y(event.mouse_region_y)
+            bpy.context.space_data.cursor_position_y = threshold
+            insertion_frames = self.get_insertion_frames(event)
+            locations = self.get_region_points_from_frames(insertion_frames)
+            self.insertion_preview_data = []
+            for frame, location in zip(insertion_frames, locations):
+                self.insertion_preview_data.append((location, round(frame) not in self.marked_frames))
+            
+        if self.selection_type == "INSERT" and not self.is_left_mouse_down:
+            self.selection_type = "NONE"
+            insert_precise_markers(self.get_insertion_frames(event))
+            
+    def get_insertion_frames(self, event):
+        start_frame = self.get_frame_under_region_x(self.selection.left)
+        end_frame = self.get_frame_under_region_x(self.selection.right)
+        threshold = bpy.context.space_data.cursor_position_y 
+        return get_precise_high_frames(self.fcurve, start_frame, end_frame, threshold)
+    
+    def get_region_points_from_frames(self, frames):
+        points = []
+        view = bpy.context.region.view2d
+        for frame in frames:
+            value = self.fcurve.evaluate(frame)
+            points.append(view.view_to_region(frame, value))
+        return points
+    
+    def get_snapping_result(self, event):
+        mouse_x = event.mouse_region_x
+        mouse_y = event.mouse_region_y
+        
+        view = bpy.context.region.view2d
+        if event.shift:
+            snap_frame = round(self.get_frame_under_region_x(mouse_x))
+        else:
+            start_frame = round(self.get_frame_under_region_x(mouse_x-20))
+            end_frame = round(self.get_frame_under_region_x(mouse_x+20))
+            
+            snap_frame = 0
+            max_value = -1000000
+            for frame in range(start_frame, end_frame):
+                value = self.fcurve.evaluate(frame)
+                if value > max_value:
+                    snap_frame = frame
+                    max_value = value
+        
+        snap_value = self.fcurve.evaluate(snap_frame)        
+        snap_location = view.view_to_region(snap_frame, snap_value)
+        return snap_location, snap_frame
+    
+    def get_frame_under_region_x(self, x):
+        return bpy.context.region.view2d.region_to_view(x, 0)[0]
+    
+    def get_view_y_under_region_y(self, y):
+        return bpy.context.region.view2d.region_to_view(0, y)[1]
+    
+    def replay_sound(self, event, seconds):
+        scene = bpy.context.scene
+        scene.frame_current -= scene.render.fps * seconds
+    
+    def is_mouse_inside(self, event, area):
+        padding = 5
+        return padding <= event.mouse_region_x < area.width-padding and padding < event.mouse_region_y < area.height-padding
+        
+    def draw_callback_px(tmp, self, context):
+        with profiler.span("Redraw"):
+            self.draw_overlay()
+
+    def draw_overlay(self):
+        if bpy.context.scene.audio_to_markers.show_spectrogram:
+            self.draw_spectrogram()
+            
+        if self.selection_type != "NONE":
+            if self.selection_type == "REMOVE":
+                self.selection.color = (1.0, 0.1, 0.1, 0.07)
+                self.selection.border_color = (0.8, 0.2, 0.1, 0.4) 
+            elif self.selection_type == "INSERT":
+                self.selection.color = (0.1, 1.0, 0.1, 0.07)
+                self.selection.border_color = (0.2, 0.8, 0.1, 0.4) 
+            self.selection.draw()
+        
+        if self.selection_type != "REMOVE":    
+            for location, enabled in self.insertion_preview_data:
+                self.draw_marker(location, enabled)
+        self.draw_operator_help()
+        
+    def draw_spectrogram(self):
+        from . import drawing, spectrogram
+        scene = bpy.context.scene
+        path = bpy.path.abspath(scene.audio_to_markers.path)
+        fps = scene.render.fps / scene.render.fps_base
+        data = spectrogram.get_spectrogram(path, fps)
+        if data is None:
+            error = spectrogram.get_error(path, fps)
+            if error is not None: drawing.draw_text(error, (240, 20), 12, (1.0, 0.4, 0.3, 1.0))
+            return
+        
+        # the visible tiles only change when the view is moved or zoomed
+        region = bpy.context.region
+        view = region.view2d
+        start_frame = self.get_audio_start_frame()
+        left_frame = view.region_to_view(0, 0)[0]
+        right_frame = view.region_to_view(region.width, 0)[0]
+        view_key = (data, start_frame, left_frame, right_frame, region.width, region.height)
+        if view_key != self.spectrogram_view:
+            self.spectrogram_view = view_key
+            self.visible_spectrogram_tiles = []
+            level = data.get_level((right_frame - left_frame) / max(region.width, 1))
+            for tile_index, first_frame, last_frame in data.get_visible_tiles(level, left_frame - start_frame, right_frame - start_frame):
+                left = view.view_to_region(start_frame + first_frame, 0, clip = False)[0]
+                right = view.view_to_region(start_frame + last_frame, 0, clip = False)[0]
+                self.visible_spectrogram_tiles.append((level, tile_index, left, right))
+                
+        for level, tile_index, left, right in self.visible_spectrogram_tiles:
+            drawing.draw_spectrogram_tile(data, level, tile_index, left, right, 0, region.height)
+        
+    def draw_marker(self, position, enabled = True):
+        if enabled: 
+            color = (0.4, 0.8, 0.2, 0.7)
+            size = 8.0
+        else: 
+            color = (0.8, 0.8, 0.8, 0.5)
+            size = 5.0
+        from . import drawing
+        drawing.draw_dot(position, size, color)
+        
+    def draw_operator_help(self): 
+        from . import drawing
+        marker_amount = self.get_marker_amount_before_current_frame()
+        text = [
+            "LMB (drag): Insert Markers",
+            "RMB drag: Remove Markers" ]
+        text.extend(get_key_binding_help(self.key_bindings))
+        
+        background = drawing.Rectangle()
+        background.color = (0.0, 0.0, 0.0, 0.6)
+        background.border_color = (0.0, 0.0, 0.0, 0.9)
+        background.top = bpy.context.area.height
+        background.bottom = background.top - 90 - len(text)*30
+        background.left = 0
+        background.right = 220
+        
+        background.draw()
+        
+        top = bpy.context.area.height - 60
+        for i, line in enumerate(text):
+            drawing.draw_text(line, (20, top - i * 30), 12)
+        drawing.draw_text("Counter: {}".format(marker_amount), (20, top - len(text) * 30 - 7), 13)
+         
+    def get_marker_amount_before_current_frame(self):
+        amount = 0
+        scene = bpy.context.scene
+        for marker in scene.timeline_markers:
+            if marker.frame <= scene.frame_current:
+                amount += 1
+        return amount  
+            
+class RemoveAllMarkers(bpy.types.Operator):
+    bl_idname = "audio_to_markers.remove_all_markers"
+    bl_label = "Remove all Markers"
+    bl_description = "Remove all markers in this scene"
+    bl_options = {"REGISTER"}
+    
+    @classmethod
+    def poll(cls, context):
+        return True
+    
+    def execute(self, context):
+        for marker in context.scene.timeline_markers:
+            context.scene.timeline_markers.remove(marker)
+        context.scene.audio_to_markers.marker_times.clear()
+        return {"FINISHED"}
+    
+class ImportMarkers(bpy.types.Operator):
+    bl_idname = "audio_to_markers.import_markers"
+    bl_label = "Import Markers"
+    bl_description = "Add markers from a file with times in seconds (CSV or text, JSON, Rekordbox xml or Ableton Live set)"
+    bl_options = {"REGISTER"}
+    
+    filepath = StringProperty(subtype = "FILE_PATH")
+    start_frame = FloatProperty(name = "Start Frame", description = "Frame of the time 0 in the file", default = 1)
+    tolerance = FloatProperty(name = "Tolerance", description = "Skip markers that are closer than this amount of frames to another marker", default = 0.5, min = 0)
+    track = StringProperty(name = "Track", description = "Name or sound file of the track or clip in Rekordbox and Ableton Live files with several tracks", default = "")
+    
+    @classmethod
+    def poll(cls, context):
+        return True
+    
+    def invoke(self, context, event):
+        self.start_frame = get_marker_time_start_frame(context.scene)
+        self.track = os.path.basename(context.scene.audio_to_markers.path)
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+    
+    def execute(self, context):
+        from . import markers
+        import numpy as np
+        scene = context.scene
+        fps = scene.render.fps / scene.render.fps_base
+        with profiler.span("Import Markers") as span:
+            names = []
+            times = []
+            try:
+                for name, time in markers.iter_marker_times(bpy.path.abspath(self.filepath), self.track):
+                    names.append(name)
+                    times.append(time)
+            except Exception as e:
+                self.report({"ERROR"}, "Cannot read markers: {}".format(e))
+                return {"CANCELLED"}
+            frames = self.start_frame + np.array(times, dtype = np.float64) * fps
+            existing_frames = [frame for name, frame in get_precise_marker_frames(scene)]
+            indices = markers.get_frames_to_merge(existing_frames, frames, self.tolerance)
+            
+            timeline_markers = scene.timeline_markers
+            marker_times = scene.audio_to_markers.marker_times
+            used_keys = {(marker.name, marker.frame) for marker in timeline_markers}
+            for index in indices.tolist():
+                frame = float(frames[index])
+                rounded_frame = int(round(frame))
+                name = get_unique_marker_name(names[index] or "#{}".format(rounded_frame), rounded_frame, used_keys)
+                marker = timeline_markers.new(name = name, frame = rounded_frame)
+                item = marker_times.add()
+                item.name = marker.name
+                item.frame = frame
+                used_keys.add((marker.name, rounded_frame))
+            span.add("Markers", len(indices))
+        self.report({"INFO"}, "Imported {} of {} markers".format(len(indices), len(times)))
+        return {"FINISHED"}
+    
+class ExportMarkers(bpy.types.Operator):
+    bl_idname = "audio_to_markers.export_markers"
+    bl_label = "Export Markers"
+    bl_description = "Save the precise marker times in seconds, the format (CSV, JSON or EDL) depends on the file extension"
+    bl_options = {"REGISTER"}
+    
+    filepath = StringProperty(subtype = "FILE_PATH", default = "markers.csv")
+    start_frame = FloatProperty(name = "Start Frame", description = "Frame of the time 0 in the file", default = 1)
+    
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.timeline_markers) > 0
+    
+    def invoke(self, context, event):
+        self.start_frame = get_marker_time_start_frame(context.scene)
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+    
+    def execute(self, context):
+        from . import markers
+        render = context.scene.render
+        with profiler.span("Export Markers") as span:
+            marker_times = get_marker_times(context.scene, self.start_frame)
+            markers.write_markers(bpy.path.abspath(self.filepath), marker_times, render.fps / render.fps_base)
+            span.add("Markers", len(marker_times))
+        return {"FINISHED"}
+                
+
+def insert_markers(frames):
+    scene = bpy.context.scene
+    with profiler.span("Insert Markers") as span:
+        marked_frames = get_marked_frames()
+        for frame in frames:
+            if frame not in marked_frames:
+                scene.timeline_markers.new(name = "#{}".format(frame), frame = frame)
+                span.add("Markers")
+
+# frames can have a fractional part, the precise frame is kept in the marker times
+def insert_precise_markers(frames):
+    scene = bpy.context.scene
+    marker_times = scene.audio_to_markers.marker_times
+    with profiler.span("Insert Markers") as span:
+        marked_frames = set(get_marked_frames())
+        for frame in frames:
+            rounded_frame = int(round(frame))
+            if rounded_frame in marked_frames: continue
+            marker = scene.timeline_markers.new(name = "#{}".format(rounded_frame), frame = rounded_frame)
+            item = marker_times.add()
+            item.name = marker.name
+            item.frame = frame
+            marked_frames.add(rounded_frame)
+            span.add("Markers")
+
+# returns (name, frame) tuples sorted by frame, markers without a precise frame are on their frame
+# a precise frame is only used while the marker has its name and is not moved to another frame
+def get_precise_marker_frames(scene):
+    precise_frames = {get_marker_time_key(item) : item.frame for item in scene.audio_to_markers.marker_times}
+    marker_frames = [(marker.name, precise_frames.get((marker.name, marker.frame), marker.frame)) for marker in scene.timeline_markers]
+    return sorted(marker_frames, key = lambda marker_frame: marker_frame[1])
+
+# returns (name, time) tuples, the time is in seconds after the start frame
+def get_marker_times(scene, start_frame):
+    fps = scene.render.fps / scene.render.fps_base
+    return [(name, (frame - start_frame) / fps) for name, frame in get_precise_marker_frames(scene)]
+
+# times in exported and imported files start with the sound of the active fcurve
+def get_marker_time_start_frame(scene):
+    fcurve = get_active_fcurve()
+    if fcurve: return get_sound_start_frame(fcurve)
+    return scene.frame_start
+
+def get_marker_time_key(item):
+    return (item.name, int(round(item.frame)))
+
+def get_unique_marker_name(name, frame, used_keys):
+    unique_name = name
+    number = 1
+    while (unique_name, frame) in used_keys:
+        unique_name = "{}.{:03d}".format(name, number)
+        number += 1
+    return unique_name
+
+def remove_marker_times(keys):
+    marker_times = bpy.context.scene.audio_to_markers.marker_times
+    for i in reversed(range(len(marker_times))):
+        if get_marker_time_key(marker_times[i]) in keys:
+            marker_times.remove(i)
+
+def get_marked_frames():
+    return [marker.frame for marker in bpy.context.scene.timeline_markers]
+
+def remove_markers(start_frame, end_frame):
+    start_frame, end_frame = sorted([start_frame, end_frame])
+    scene = bpy.context.scene
+    with profiler.span("Remove Markers") as span:
+        removed_keys = set()
+        for marker in scene.timeline_markers:
+            if start_frame <= marker.frame <= end_frame:
+                removed_keys.add((marker.name, marker.frame))
+                scene.timeline_markers.remove(marker)
+                span.add("Markers")
+        remove_marker_times(removed_keys)
+
+def get_high_frames(sound_curve, start, end, threshold):
+    start, end = sorted([start, end])
+    start, end = round(start), round(end)
+    if end <= start: return []
+    from . import core
+    with profiler.span("Detect High Frames") as span:
+        frames = range(start, end + 1)
+        stored_values = get_stored_fcurve_values(sound_curve)
+        if stored_values is None:
+            values = core.highest_values(*[[sound_curve.evaluate(frame + offset) for frame in frames] for offset in (-0.5, -0.25, 0, 0.25)])
+        else:
+            first_frame, frame_values = stored_values
+            values = core.highest_values(*[core.evaluate_per_frame_values(first_frame, frame_values, [frame + offset for frame in frames]) for offset in (-0.5, -0.25, 0, 0.25)])
+        high_frames = [start + int(index) for index in core.find_high_frames(values, threshold)]
+        span.add("Frames", end - start)
+    return high_frames
+
+onset_rate = 240
+decoded_sound_cache = {}
+onset_envelope_cache = {}
+
+# returns frames with a fractional part, the peaks are found on an envelope with
+# onset_rate values per second when the curve has been baked with the filter of this
+# addon and its sound can be read again, otherwise on the frames of the curve
+def get_precise_high_frames(sound_curve, start, end, threshold):
+    from . import core, decoding
+    index = get_bake_data_index_from_fcurve(sound_curve)
+    item = bpy.context.scene.audio_to_markers.bake_data[index] if index != -1 else None
+    path = bpy.path.abspath(item.path) if item else ""
+    render = bpy.context.scene.render
+    fps = render.fps / render.fps_base
+    if item is None or item.bake_method != "FILTER" or item.is_mixdown or item.sequence_name != "" or \
+            item.use_processing or not has_precise_onsets(item.low, fps) or not decoding.can_read(path):
+        return [float(frame) for frame in get_high_frames(sound_curve, start, end, threshold)]
+    
+    start, end = sorted([start, end])
+    envelope = get_onset_envelope(path, item.low, item.high)
+    width = get_onset_width(item.low)
+    with profiler.span("Detect Precise High Frames") as span:
+        sound_start_frame = get_sound_start_frame(sound_curve)
+        # more values on both sides for the running maximum and the parabola of the peaks at the borders
+        first_value = max(int((start - sound_start_frame) / fps * onset_rate) - width, 0)
+        last_value = max(int(math.ceil((end - sound_start_frame) / fps * onset_rate)) + 2, first_value)
+        # a value is the highest amplitude in its block, the center is the best guess for the time
+        times = (first_value + core.find_precise_peaks(envelope[first_value:last_value], threshold, width) + 0.5) / onset_rate
+        frames = sound_start_frame + times * fps
+        span.add("Values", len(envelope[first_value:last_value]))
+    return [float(frame) for frame in frames if start <= frame <= end]
+
+# the envelope of low frequences still follows their periods,
+# so the peaks are searched on the maximum over one period of the lowest frequence
+def get_onset_width(low):
+    return max(int(math.ceil(onset_rate / low)), 1)
+
+# when a period is longer than a frame, the per frame values are as precise
+def has_precise_onsets(low, fps):
+    return low > 0 and get_onset_width(low) <= onset_rate / fps
+
+# the envelope of the whole file is computed once, so that the preview
+# while dragging finds the same frames as the insertion
+def get_onset_envelope(path, low, high):
+    from . import core
+    key = (path, os.path.getmtime(path), low, high)
+    if key not in onset_envelope_cache:
+        samples, sample_rate = get_decoded_sound(path)
+        with profiler.span("Extract Onset Envelope") as span:
+            onset_envelope_cache.clear()
+            onset_envelope_cache[key] = core.extract_envelope(samples, sample_rate, low, high, onset_rate)
+            span.add("Values", len(onset_envelope_cache[key]))
+    return onset_envelope_cache[key]
+
+def get_decoded_sound(path):
+    from . import decoding
+    key = (path, os.path.getmtime(path))
+    if key not in decoded_sound_cache:
+        decoded_sound_cache.clear()
+        decoded_sound_cache[key] = decoding.read_samples(path)
+    return decoded_sound_cache[key]
+
+# the sound starts at the first frame of the baked values
+def get_sound_start_frame(fcurve):
+    stored_values = get_stored_fcurve_values(fcurve)
+    if stored_values is not None: return stored_values[0]
+    return fcurve.range()[0]
+
+
+
+
+# Baked FCurves
+################################################                        
+
+                       
+class UnbakeFCurve(bpy.types.Operator):
+    bl_idname = "audio_to_markers.unbake_fcurves"
+    bl_label = "Unbake FCurves"
+    bl_description = "Convert selected fcurves to keyframes."
+    bl_options = {"REGISTER", "UNDO"}
+    
+    @classmethod
+    def poll(cls, context):
+        return not is_background_bake_running() and len(list(cls.fcurves_with_owners_to_unbake())) > 0
+    
+    def execute(self, context):
+        for object, fcurve in self.fcurves_with_owners_to_unbake():
+            if len(fcurve.sampled_points) > 0 and not fcurve.lock:
+                self.unbake_fcurve(object, fcurve)
+        return {"FINISHED"}
+    
+    @classmethod
+    def fcurves_with_owners_to_unbake(cls):
+        for fcurve_with_owner in get_active_fcurves(return_owner = True):
+            fcurve = fcurve_with_owner[1]
+            if len(fcurve.sampled_points) > 0 and not fcurve.lock:
+                yield fcurve_with_owner
+    
+    def unbake_fcurve(self, object, fcurve):
+        from . import core
+        with profiler.span("Unbake FCurve") as span:
+            stored_values = get_stored_fcurve_values(fcurve)
+            if stored_values is None:
+                sample_locations = [(sample.co[0], sample.co[1]) for sample in fcurve.sampled_points]
+                keyframe_locations = list(zip(*core.simplify(*zip(*sample_locations))))
+            else:
+                first_frame, sample_locations = stored_values
+                frames, values = core.simplify(range(first_frame, first_frame + len(sample_locations)), sample_locations)
+                keyframe_locations = list(zip(frames.tolist(), values.tolist()))
+            data_path = fcurve.data_path
+            index = fcurve.array_index
+            object.animation_data.action.fcurves.remove(fcurve)
+            fcurve = object.animation_data.action.fcurves.new(data_path = data_path, index = index)
+            for co in keyframe_locations:
+                keyframe = fcurve.keyframe_points.insert(frame = co[0], value = co[1])
+                keyframe.interpolation = "LINEAR"
+            span.add("Samples", len(sample_locations))
+            span.add("Keyframes", len(keyframe_locations))
+        bpy.context.area.tag_redraw()  
+        
+        
+class CopyBakedFCurveData(bpy.types.Operator):
+    bl_idname = "audio_to_markers.copy_baked_fcurve_data"
+    bl_label = "Copy Baked Data"
+    bl_description = ""
+    bl_options = {"REGISTER"}
+    
+    @classmethod
+    def poll(cls, context):
+        return cls.get_source_fcurve()
+    
+    def execute(self, context):
+        global copied_keyframe_locations
+        copied_keyframe_locations = []
+        baked_fcurve = self.get_source_fcurve()
+        stored_values = get_stored_fcurve_values(baked_fcurve) if baked_fcurve else None
+        if stored_values:
+            copied_keyframe_locations = ArrayLocations(*stored_values)
+        elif baked_fcurve:
+            for sample in baked_fcurve.sampled_points:
+                copied_keyframe_locations.append((sample.co[0], sample.co[1]))
+        return {"FINISHED"}
+    
+    @classmethod
+    def get_source_fcurve(cls, return_owner = False):
+        for fcurve_with_owner in get_active_fcurves(return_owner = True):
+            if len(fcurve_with_owner[1].sampled_points) > 0:
+                if return_owner: return fcurve_with_owner
+                else: return fcurve_with_owner[1]
+        return None
+    
+    
+class PasteCopiedBakedFCurveData(bpy.types.Operator):
+    bl_idname = "audio_to_markers.paste_copied_baked_fcurve_data"
+    bl_label = "Paste Copied Bake Data"
+    bl_description = ""
+    bl_options = {"REGISTER", "UNDO"}
+    
+    @classmethod
+    def poll(cls, context):
+        return not is_background_bake_running() and cls.get_target_amount() > 0 and len(copied_keyframe_locations) > 0
+        
+    def modal(self, context, event):
+        if event.type == "ESC": 
+            self.cancel(context)
+            return {"CANCELLED"}
+        if event.type in ["MIDDLEMOUSE", "WHEELDOWNMOUSE", "WHEELUPMOUSE"]: return {"PASS_THROUGH"}
+        if event.type == "TIMER" and self.counter % 3 == 0:
+            with profiler.span("Paste Keyframes") as span:
+                for fcurve in self.fcurves:
+                    for i in range(self.progress_index, self.progress_index + self.chunk_size):
+                        if i >= self.keyframe_amount: 
+                            self.cancel(context)
+                            return {"FINISHED"}
+                        co = copied_keyframe_locations[i]
+                        keyframe = fcurve.keyframe_points.insert(frame = co[0], value = co[1])
+                        keyframe.interpolation = "LINEAR"
+                        span.add("Keyframes")
+            self.progress_index += self.chunk_size
+            self.settings.paste_keyframes_info_text = "{} of {} Keyframes".format(self.progress_index, self.keyframe_amount)
+            context.area.tag_redraw()
+            
+        self.counter += 1
+            
+        return {"RUNNING_MODAL"}
+    
+    def invoke(self, context, event):
+        context.window_manager.modal_handler_add(self)
+        self.progress_index = 0
+        self.counter = 0
+        self.chunk_size = 30
+        self.fcurves = list(self.selected_unbaked_fcurves())
+        self.keyframe_amount = len(copied_keyframe_locations)
+        self.settings = context.scene.audio_to_markers
+        self.settings.paste_keyframes_info_text = "{} of {} Keyframes".format(0, self.keyframe_amount)
+        self.timer = context.window_manager.event_timer_add(0.005, context.window)
+        return {"RUNNING_MODAL"}
+    
+    def cancel(self, context):
+        context.window_manager.event_timer_remove(self.timer)
+        self.settings.paste_keyframes_info_text = ""
+        
+    @classmethod
+    def get_target_amount(cls):
+        return len(list(cls.selected_unbaked_fcurves()))
+    
+    @classmethod
+    def selected_unbaked_fcurves(cls):
+        for fcurve in get_active_fcurves():
+            if len(fcurve.sampled_points) == 0: yield fcurve
+            
+                              
+ 
+
+# Packed Bake Data
+################################################
+
+# packs the baked fcurves and keeps fcurves only for the current frequence range
+# and for items that use them, this is skipped while bakes write into fcurves
+def update_bake_storage():
+    if is_background_bake_running(): return
+    settings = bpy.context.scene.audio_to_markers
+    keep_fcurves = settings.bake_storage == "FCURVE"
+    packed_type = "FLOAT32" if keep_fcurves else settings.bake_storage
+    # cache files are next to the .blend file, until it is saved the values are packed
+    if packed_type == "CACHE" and not can_use_cache_files(): packed_type = "FLOAT32"
+    current_index = get_current_bake_item(return_type = "INDEX")
+    for index, item in enumerate(settings.bake_data):
+        fcurve = get_fcurve_from_bake_data_index(index)
+        
+        # the fcurve of a sidecar is only a view on the file and
+        # the fcurve of processed data shows the result of the processing,
+        # an unbaked fcurve has keyframes of the user and is never replaced
+        is_baked_fcurve = fcurve is not None and len(fcurve.sampled_points) > 0
+        if is_baked_fcurve and item.sidecar_path == "":
+            if not item.use_processing:
+                if not keep_fcurves: store_bake_fcurve(item, fcurve, packed_type)
+            elif item.packed_values == "":
+                store_bake_fcurve(item, fcurve, packed_type)
+                bpy.context.scene.animation_data.action.fcurves.remove(fcurve)
+                fcurve = None
+        if packed_type == "CACHE" and item.packed_values != "":
+            cache_bake_values(item, item.packed_start_frame, get_stored_values(item)[1])
+                
+        needs_fcurve = keep_fcurves or index == current_index or item.use_fcurve
+        if fcurve and is_baked_fcurve and not needs_fcurve and has_stored_values(item):
+            bpy.context.scene.animation_data.action.fcurves.remove(fcurve)
+        elif not fcurve and needs_fcurve and has_stored_values(item):
+            materialize_bake_fcurve(index)
+        if keep_fcurves and not item.use_processing:
+            item.packed_values = ""
+            
+def store_bake_fcurve(item, fcurve, storage_type):
+    if storage_type == "CACHE": cache_bake_fcurve(item, fcurve)
+    else: pack_bake_fcurve(item, fcurve, storage_type)
+
+# the item only references a content addressed file, so undo steps stay small
+# and undo and redo of a bake do not copy the values
+def cache_bake_fcurve(item, fcurve):
+    cache_bake_values(item, *get_fcurve_values_per_frame(fcurve))
+    
+def cache_bake_values(item, first_frame, values):
+    from . import sidecar
+    with profiler.span("Cache Values") as span:
+        render = bpy.context.scene.render
+        name = sidecar.write_cached_values(bpy.path.abspath(get_cache_directory()), [values], render.fps / render.fps_base,
+            {"bands" : [[item.low, item.high]], "source" : item.path, "start_frame" : first_frame})
+        item.sidecar_path = name
+        item.is_cached = True
+        item.sidecar_band = 0
+        item.packed_start_frame = first_frame
+        item.packed_values = ""
+        span.add("Values", len(values))
+        
+# every .blend file has its own directory, so that removing unused files
+# does not remove the files of other .blend files in the same folder
+def get_cache_directory():
+    name = os.path.splitext(os.path.basename(bpy.data.filepath))[0]
+    return "//" + cache_directory_name + "/" + name
+    
+def can_use_cache_files():
+    return bpy.data.filepath != ""
+    
+def get_sidecar_abspath(item):
+    if item.is_cached: return os.path.join(bpy.path.abspath(get_cache_directory()), item.sidecar_path)
+    return bpy.path.abspath(item.sidecar_path)
+    
+# cached items only store the name of their file, when the .blend file is saved
+# under another name or into another folder the files are copied into the new directory
+cache_directory_before_save = None
+
+@persistent
+def remember_cache_directory_handler(dummy):
+    global cache_directory_before_save
+    cache_directory_before_save = bpy.path.abspath(get_cache_directory()) if can_use_cache_files() else None
+    
+@persistent
+def copy_cache_files_handler(dummy):
+    import shutil
+    old_directory = cache_directory_before_save
+    new_directory = bpy.path.abspath(get_cache_directory())
+    if old_directory is None or os.path.normpath(old_directory) == os.path.normpath(new_directory): return
+    for scene in bpy.data.scenes:
+        for item in scene.audio_to_markers.bake_data:
+            if not item.is_cached: continue
+            old_path = os.path.join(old_directory, item.sidecar_path)
+            new_path = os.path.join(new_directory, item.sidecar_path)
+            if os.path.isfile(new_path) or not os.path.isfile(old_path): continue
+            os.makedirs(new_directory, exist_ok = True)
+            # the name is the hash of the content, so a partial file must never have the name
+            temporary_path = "{}.{}.tmp".format(new_path, os.getpid())
+            shutil.copyfile(old_path, temporary_path)
+            os.replace(temporary_path, new_path)
+        
+def pack_bake_fcurve(item, fcurve, packed_type):
+    from . import storage
+    with profiler.span("Pack FCurve") as span:
+        first_frame, values = get_fcurve_values_per_frame(fcurve)
+        item.packed_values = storage.pack_values(values, packed_type)
+        item.packed_type = packed_type
+        item.packed_start_frame = first_frame
+        span.add("Values", len(values))
+        
+def get_fcurve_values_per_frame(fcurve):
+    from . import storage
+    points = fcurve.sampled_points if len(fcurve.sampled_points) > 0 else fcurve.keyframe_points
+    locations = [0.0] * (len(points) * 2)
+    points.foreach_get("co", locations)
+    return storage.values_per_frame(locations[0::2], locations[1::2])
+    
+def materialize_bake_fcurve(index):
+    item = bpy.context.scene.audio_to_markers.bake_data[index]
+    stored_values = get_processed_values(item)
+    if stored_values is None or len(stored_values[1]) == 0: return
+    first_frame, values = stored_values
+    with profiler.span("Materialize FCurve") as span:
+        item.keyframe_insert("intensity", frame = first_frame)
+        fcurve = get_fcurve_from_bake_data_index(index)
+        locations = []
+        for i, value in enumerate(values.tolist()):
+            locations.extend((first_frame + i, value))
+        fcurve.keyframe_points.add(len(values) - 1)
+        fcurve.keyframe_points.foreach_set("co", locations)
+        fcurve.update()
+        fcurve.convert_to_samples(first_frame, first_frame + len(values) - 1)
+        span.add("Values", len(values))
+        
+def has_stored_values(item):
+    return item.packed_values != "" or item.sidecar_path != ""
+        
+# returns the first frame and one value per frame without copying when possible
+def get_stored_values(item):
+    if item.sidecar_path != "":
+        from . import sidecar
+        try: data = sidecar.open_sidecar(get_sidecar_abspath(item))
+        except (OSError, ValueError): return None
+        if item.sidecar_band >= len(data.values): return None
+        values = data.values[item.sidecar_band]
+        render = bpy.context.scene.render
+        fps = render.fps / render.fps_base
+        if data.rate != fps:
+            from . import core
+            frame_amount = int(len(values) * fps / data.rate)
+            values = core.evaluate_per_frame_values(0, values, [frame * data.rate / fps for frame in range(frame_amount)])
+        return item.packed_start_frame, values
+    if item.packed_values != "":
+        from . import storage
+        return item.packed_start_frame, storage.get_unpacked_values(item.packed_values, item.packed_type)
+    return None
+    
+def get_stored_fcurve_values(fcurve):
+    index = get_bake_data_index_from_fcurve(fcurve)
+    if index == -1: return None
+    return get_processed_values(bpy.context.scene.audio_to_markers.bake_data[index])
+    
+# the processing result of every item is cached as long as
+# the stored values and the parameters do not change
+def get_processed_values(item):
+    if not item.use_processing: return get_stored_values(item)
+    from . import core
+    try: source = get_stored_values_source(item)
+    except OSError: return None
+    parameters = (item.smoothing, item.attack, item.release, item.gate,
+        item.compression_threshold, item.compression_ratio, item.normalize)
+    key = item.path_from_id()
+    cached = processed_values_cache.get(key)
+    if cached is None or cached[0] != source or cached[1] != parameters:
+        stored_values = get_stored_values(item)
+        if stored_values is None: return None
+        values = stored_values[1]
+        with profiler.span("Process Envelope") as span:
+            cached = (source, parameters, core.process_envelope(values, *parameters))
+            span.add("Values", len(values))
+        processed_values_cache[key] = cached
+    return item.packed_start_frame, cached[2]
+
+# identifies the stored values without reading them
+def get_stored_values_source(item):
+    if item.sidecar_path != "":
+        path = get_sidecar_abspath(item)
+        render = bpy.context.scene.render
+        return (path, os.stat(path).st_mtime_ns, item.sidecar_band, item.packed_start_frame, render.fps / render.fps_base)
+    return (item.packed_values, item.packed_type, item.packed_start_frame)
+
+def get_bake_data_index_from_fcurve(fcurve):
+    index = get_bake_data_index_from_path(fcurve.data_path)
+    if index == -1: return -1
+    if get_fcurve_from_bake_data_index(index) != fcurve: return -1
+    return index
+    
+def get_bake_data_index_from_path(data_path):
+    match = bake_data_path_pattern.match(data_path)
+    if not match: return -1
+    index = int(match.group(1))
+    if index >= len(bpy.context.scene.audio_to_markers.bake_data): return -1
+    return index
+    
+def link_bake_item_to_sidecar(index, path, band, start_frame):
+    item = bpy.context.scene.audio_to_markers.bake_data[index]
+    fcurve = get_fcurve_from_bake_data_index(index)
+    if fcurve:
+        bpy.context.scene.animation_data.action.fcurves.remove(fcurve)
+    item.packed_values = ""
+    item.sidecar_path = path
+    item.is_cached = False
+    item.sidecar_band = band
+    item.packed_start_frame = start_frame
+    
+def get_sidecar_export_indices():
+    settings = bpy.context.scene.audio_to_markers
+    return [index for index, item in enumerate(settings.bake_data)
+        if item.path == settings.path and item.sequence_name == "" and not item.is_mixdown]
+    
+class RemoveUnusedCacheFiles(bpy.types.Operator):
+    bl_idname = "audio_to_markers.remove_unused_cache_files"
+    bl_label = "Remove Unused Cache Files"
+    bl_description = "Delete cached bake files that are not used by any scene, older undo steps cannot restore their values anymore"
+    bl_options = {"REGISTER", "INTERNAL"}
+    
+    @classmethod
+    def poll(cls, context):
+        return can_use_cache_files()
+    
+    def execute(self, context):
+        from . import sidecar
+        used_names = set()
+        for scene in bpy.data.scenes:
+            for item in scene.audio_to_markers.bake_data:
+                if item.is_cached: used_names.add(item.sidecar_path)
+        directory = bpy.path.abspath(get_cache_directory())
+        removed_amount = sidecar.remove_unused_cached_files(directory, used_names)
+        self.report({"INFO"}, "Removed {} files".format(removed_amount))
+        return {"FINISHED"}
+    
+# (frame, value) sequence on an array of values without copying it
+class ArrayLocations:
+    def __init__(self, first_frame, values):
+        self.first_frame = first_frame
+        self.values = values
+        
+    def __len__(self):
+        return len(self.values)
+        
+    def __getitem__(self, index):
+        return (self.first_frame + index, float(self.values[index]))
+    
+def get_fcurve_point_amount(fcurve):
+    return len(fcurve.sampled_points) + len(fcurve.keyframe_points)
+    
+                              
+ 
+
+class ExportSidecar(bpy.types.Operator):
+    bl_idname = "audio_to_markers.export_sidecar"
+    bl_label = "Export Sidecar"
+    bl_description = "Save all bands baked from the current sound into a sidecar envelope file and read them from there"
+    bl_options = {"REGISTER", "INTERNAL"}
+    
+    filepath = StringProperty(subtype = "FILE_PATH", default = "envelopes.atmenv")
+    
+    @classmethod
+    def poll(cls, context):
+        return not is_background_bake_running() and len(get_sidecar_export_indices()) > 0
+    
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+    
+    def execute(self, context):
+        from . import sidecar
+        import numpy as np
+        settings = context.scene.audio_to_markers
+        render = context.scene.render
+        
+        indices = []
+        frame_values = []
+        for index in get_sidecar_export_indices():
+            item = settings.bake_data[index]
+            stored_values = get_stored_values(item)
+            if stored_values is None:
+                fcurve = get_fcurve_from_bake_data_index(index)
+                if not fcurve or get_fcurve_point_amount(fcurve) == 0: continue
+                stored_values = get_fcurve_values_per_frame(fcurve)
+            indices.append(index)
+            frame_values.append(stored_values)
+        if len(frame_values) == 0:
+            self.report({"ERROR"}, "No band of the current sound has baked values")
+            return {"CANCELLED"}
+        
+        start_frame = min(first_frame for first_frame, values in frame_values)
+        end_frame = max(first_frame + len(values) for first_frame, values in frame_values)
+        envelopes = np.zeros((len(frame_values), end_frame - start_frame), dtype = np.float32)
+        for i, (first_frame, values) in enumerate(frame_values):
+            envelopes[i, first_frame - start_frame:first_frame - start_frame + len(values)] = values
+        # the values can be a mapping of the file that is overwritten now
+        del frame_values
+        
+        metadata = {
+            "bands" : [[settings.bake_data[index].low, settings.bake_data[index].high] for index in indices],
+            "source" : settings.path,
+            "start_frame" : start_frame,
+            "methods" : [settings.bake_data[index].bake_method for index in indices] }
+        value_type = "<f2" if settings.bake_storage == "FLOAT16" else "<f4"
+        sidecar.write_sidecar(bpy.path.abspath(self.filepath), envelopes, render.fps / render.fps_base, metadata, value_type)
+        
+        for band, index in enumerate(indices):
+            link_bake_item_to_sidecar(index, self.filepath, band, start_frame)
+        update_fcurve_visibility()
+        return {"FINISHED"}
+    
+    
+class LinkSidecar(bpy.types.Operator):
+    bl_idname = "audio_to_markers.link_sidecar"
+    bl_label = "Link Sidecar"
+    bl_description = "Use the bands of a sidecar envelope file without copying them into this file"
+    bl_options = {"REGISTER", "INTERNAL"}
+    
+    filepath = StringProperty(subtype = "FILE_PATH")
+    
+    @classmethod
+    def poll(cls, context):
+        return not is_background_bake_running()
+    
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+    
+    def execute(self, context):
+        from . import sidecar
+        try: data = sidecar.open_sidecar(bpy.path.abspath(self.filepath))
+        except (OSError, ValueError) as e:
+            self.report({"ERROR"}, str(e))
+            return {"CANCELLED"}
+        source = data.metadata.get("source", self.filepath)
+        start_frame = data.metadata.get("start_frame", context.scene.frame_start)
+        methods = data.metadata.get("methods", [])
+        method_identifiers = [identifier for identifier, name, description in bake_method_items]
+        for band, (low, high) in enumerate(data.bands):
+            index = get_bake_item_index(source, low, high)
+            if index == -1:
+                new_bake_item(source, low, high)
+                index = len(context.scene.audio_to_markers.bake_data) - 1
+            link_bake_item_to_sidecar(index, self.filepath, band, start_frame)
+            method = methods[band] if band < len(methods) else "EXTERNAL"
+            context.scene.audio_to_markers.bake_data[index].bake_method = method if method in method_identifiers else "EXTERNAL"
+        update_fcurve_visibility()
+        return {"FINISHED"}
+        
+        
+# Profiling
+################################################ 
+
+class ExportProfile(bpy.types.Operator):
+    bl_idname = "audio_to_markers.export_profile"
+    bl_label = "Export Profile"
+    bl_description = "Save the measured timings as Chrome trace file (open with chrome://tracing)"
+    bl_options = {"REGISTER", "INTERNAL"}
+    
+    filepath = StringProperty(subtype = "FILE_PATH", default = "audio_to_markers_profile.json")
+    
+    @classmethod
+    def poll(cls, context):
+        return len(profiler.spans) > 0
+    
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+    
+    def execute(self, context):
+        with open(bpy.path.abspath(self.filepath), "w") as f:
+            json.dump(profiler.to_chrome_trace(), f)
+        return {"FINISHED"}
+    
+    
+class ClearProfile(bpy.types.Operator):
+    bl_idname = "audio_to_markers.clear_profile"
+    bl_label = "Clear Profile"
+    bl_description = "Remove all measured timings"
+    bl_options = {"REGISTER", "INTERNAL"}
+    
+    @classmethod
+    def poll(cls, context):
+        return True
+    
+    def execute(self, context):
+        profiler.clear()
+        return {"FINISHED"}
+                              
+ 
+
+# Helper
+################################################ 
+
+def get_active_fcurve():
+    fcurves = get_active_fcurves()
+    if len(fcurves) > 0: return fcurves[0]
+    return None
+
+def get_active_fcurves(return_owner = False):
+    fcurves_with_owner = []
+    for object in bpy.context.selected_objects + [bpy.context.scene]:
+        try:
+            for fcurve in object.animation_data.action.fcurves:
+                if fcurve.select: fcurves_with_owner.append((object, fcurve))
+        except: pass
+    if return_owner: return fcurves_with_owner
+    return [fcurve_with_owner[1] for fcurve_with_owner in fcurves_with_owner]                                           
+
+def create_item_and_fcurve_from_current_settings():
+    settings = bpy.context.scene.audio_to_markers
+    return create_item_and_fcurve(settings.path, settings.low_frequence, settings.high_frequence)
+
+def create_item_and_fcurve(path, low, high, sequence_name = "", is_mixdown = False):
+    index = get_bake_item_index(path, low, high, sequence_name, is_mixdown)
+    if index == -1:
+        item = new_bake_item(path, low, high, sequence_name, is_mixdown)
+        index = len(bpy.context.scene.audio_to_markers.bake_data) - 1
+    else:
+        item = bpy.context.scene.audio_to_markers.bake_data[index]
+    fcurve = get_fcurve_from_bake_data_index(index)
+    if not fcurve:
+        item.keyframe_insert("intensity", frame = 0)
+        fcurve = get_fcurve_from_bake_data_index(index)
+    return fcurve
+
+# replaces the fcurve of the bake item to remove old samples and keyframes
+def create_empty_bake_fcurve(path, low, high, sequence_name = "", is_mixdown = False, bake_method = "FILTER"):
+    fcurve = create_item_and_fcurve(path, low, high, sequence_name, is_mixdown)
+    index = get_bake_item_index(path, low, high, sequence_name, is_mixdown)
+    item = bpy.context.scene.audio_to_markers.bake_data[index]
+    item.bake_method = bake_method
+    item.packed_values = ""
+    item.sidecar_path = ""
+    item.is_cached = False
+    action = bpy.context.scene.animation_data.action
+    data_path = fcurve.data_path
+    action.fcurves.remove(fcurve)
+    return action.fcurves.new(data_path = data_path, index = 0)
+    
+stored_value_property_names = ("bake_method", "packed_values", "packed_type", "packed_start_frame", "sidecar_path", "sidecar_band", "is_cached")
+
+# returns None when the item has no values yet,
+# the values of a baked fcurve are packed into the backup
+def backup_bake_item(index):
+    from . import storage
+    item = bpy.context.scene.audio_to_markers.bake_data[index]
+    fcurve = get_fcurve_from_bake_data_index(index)
+    properties = {name : getattr(item, name) for name in stored_value_property_names}
+    keyframes = []
+    if fcurve and len(fcurve.sampled_points) > 0:
+        if not has_stored_values(item):
+            first_frame, values = get_fcurve_values_per_frame(fcurve)
+            properties.update(packed_values = storage.pack_values(values, "FLOAT32"), packed_type = "FLOAT32", packed_start_frame = first_frame)
+    elif fcurve:
+        keyframes = [(tuple(keyframe.co), keyframe.interpolation) for keyframe in fcurve.keyframe_points]
+    if len(keyframes) == 0 and properties["packed_values"] == "" and properties["sidecar_path"] == "": return None
+    return properties, keyframes
+
+def restore_bake_item(index, properties, keyframes):
+    item = bpy.context.scene.audio_to_markers.bake_data[index]
+    fcurve = get_fcurve_from_bake_data_index(index)
+    if fcurve: bpy.context.scene.animation_data.action.fcurves.remove(fcurve)
+    for name, value in properties.items():
+        setattr(item, name, value)
+    if len(keyframes) > 0:
+        item.keyframe_insert("intensity", frame = keyframes[0][0][0])
+        fcurve = get_fcurve_from_bake_data_index(index)
+        for (frame, value), interpolation in keyframes:
+            keyframe = fcurve.keyframe_points.insert(frame = frame, value = value)
+            keyframe.interpolation = interpolation
+    elif has_stored_values(item):
+        materialize_bake_fcurve(index)
+        
+def new_bake_item(path, low, high, sequence_name = "", is_mixdown = False):
+    item = bpy.context.scene.audio_to_markers.bake_data.add()
+    item.path = path
+    item.low = low
+    item.high = high
+    item.sequence_name = sequence_name
+    item.is_mixdown = is_mixdown
+    return item           
+                
+def get_fcurve_from_current_settings():
+    index = get_current_bake_item(return_type = "INDEX")
+    return get_fcurve_from_bake_data_index(index)
+
+def get_current_bake_item(return_type = "ITEM"):
+    settings = bpy.context.scene.audio_to_markers  
+    index = get_bake_item_index(settings.path, settings.low_frequence, settings.high_frequence)
+    if return_type == "ITEM": return settings.bake_data[index] if index != -1 else None
+    else: return index
+
+def get_bake_item_index(path, low, high, sequence_name = "", is_mixdown = False):
+    index = -1
+    for i, item in enumerate(bpy.context.scene.audio_to_markers.bake_data):
+        if item.path == path and is_same_frequence(item.low, low) and is_same_frequence(item.high, high) and \
+                item.sequence_name == sequence_name and item.is_mixdown == is_mixdown:
+            index = i
+    return index
+
+# frequences are stored with single precision, so the edges of a band set
+# are not exactly the values they were created from
+def is_same_frequence(a, b):
+    return math.isclose(a, b, rel_tol = 1e-5, abs_tol = 1e-5)
+    
+def get_band_set(settings):
+    return create_band_set(settings.band_set_type, settings.band_amount,
+        settings.band_low_frequence, settings.band_high_frequence, settings.custom_bands)
+    
+def get_bake_item_label(item):
+    if item.is_mixdown: name = "Mixdown"
+    elif item.sequence_name != "": name = item.sequence_name
+    else: name = os.path.basename(item.path)
+    return "{}: {:.0f} - {:.0f} Hz".format(name, item.low, item.high)
+    
+def get_sound_strips(scene):
+    if not scene.sequence_editor: return []
+    return [sequence for sequence in scene.sequence_editor.sequences_all if sequence.type == "SOUND" and not sequence.mute]
+        
+def get_bake_data_fcurves():
+    fcurves = []
+    for i in range(len(bpy.context.scene.audio_to_markers.bake_data)):
+        fcurve = get_fcurve_from_bake_data_index(i)
+        if fcurve: fcurves.append(fcurve)
+    return fcurves
+  
+def get_fcurve_from_bake_data_index(index):
+    return get_fcurve_from_path(bpy.context.scene, "audio_to_markers.bake_data[{}].intensity".format(index))
+  
+def get_fcurve_from_path(object, data_path):
+    try:
+        for fcurve in object.animation_data.action.fcurves:
+            if fcurve.data_path == data_path:
+                return fcurve
+    except: pass
+    return None                         
+                         
+def only_select_fcurve(fcurve):
+    deselect_all_fcurves()
+    fcurve.select = True
+    
+def deselect_all_fcurves():
+    for fcurve in iter_all_fcurves():
+        fcurve.select = False
+ 
+def iter_all_fcurves():
+    for action in bpy.data.actions:
+        for fcurve in action.fcurves:
+            yield fcurve
+        
+def get_mouse_position(event):
+    return Vector((event.mouse_region_x, event.mouse_region_y))        
+ 
+# Key Bindings
+################################################
+
+# (identifier, name, description shown in the operator help or empty)
+marker_insertion_actions = [
+    ("PLAY_PAUSE_RESET", "Play from Cursor", "Play from cursor/Pause"),
+    ("PLAY_PAUSE", "Play/Pause", ""),
+    ("AUDITION", "Audition", "Audition from cursor/Stop"),
+    ("TAP", "Tap Marker", "Tap Marker while auditioning"),
+    ("FULLSCREEN", "Fullscreen", ""),
+    ("FINISH", "Finish", "Finish operator"),
+    ("PASS_THROUGH", "Pass Through", "") ]
+
+# (action, type, value, shift, ctrl, alt)
+default_key_bindings = [
+    ("PLAY_PAUSE", "A", "PRESS", False, False, True),
+    ("PLAY_PAUSE_RESET", "SPACE", "PRESS", False, False, False),
+    ("FINISH", "ESC", "PRESS", False, False, False),
+    ("FULLSCREEN", "SPACE", "PRESS", True, False, False),
+    ("AUDITION", "P", "PRESS", False, False, False),
+    ("TAP", "T", "PRESS", False, False, False),
+    ("PASS_THROUGH", "WHEELUPMOUSE", "ANY", False, False, False),
+    ("PASS_THROUGH", "WHEELDOWNMOUSE", "ANY", False, False, False),
+    ("PASS_THROUGH", "MIDDLEMOUSE", "ANY", False, False, False),
+    ("PASS_THROUGH", "MIDDLEMOUSE", "ANY", False, True, False) ]
+
+event_value_items = [(value, value.replace("_", " ").title(), "") for value in ("PRESS", "RELEASE", "CLICK", "DOUBLE_CLICK", "ANY")]
+event_type_items = [(item.identifier, item.name, "") for item in bpy.types.Event.bl_rna.properties["type"].enum_items]
+
+class KeyBinding(bpy.types.PropertyGroup):
+    action = EnumProperty(name = "Action", items = marker_insertion_actions)
+    type = EnumProperty(name = "Type", items = event_type_items)
+    value = EnumProperty(name = "Value", items = event_value_items, default = "PRESS")
+    shift = BoolProperty(name = "Shift", default = False)
+    ctrl = BoolProperty(name = "Ctrl", default = False)
+    alt = BoolProperty(name = "Alt", default = False)
+
+class AudioToMarkersPreferences(bpy.types.AddonPreferences):
+    bl_idname = __package__
+    
+    key_bindings = CollectionProperty(name = "Key Bindings", type = KeyBinding)
+    
+    def draw(self, context):
+        layout = self.layout
+        layout.label("Insert Markers Keys:")
+        if len(self.key_bindings) == 0:
+            layout.operator("audio_to_markers.reset_key_bindings", text = "Edit Keys")
+            return
+        col = layout.column(align = True)
+        for index, key_binding in enumerate(self.key_bindings):
+            row = col.row(align = True)
+            row.prop(key_binding, "action", text = "")
+            row.prop(key_binding, "type", text = "")
+            row.prop(key_binding, "value", text = "")
+            row.prop(key_binding, "shift", toggle = True)
+            row.prop(key_binding, "ctrl", toggle = True)
+            row.prop(key_binding, "alt", toggle = True)
+            props = row.operator("audio_to_markers.remove_key_binding", icon = "X", text = "")
+            props.index = index
+        row = layout.row(align = True)
+        row.operator("audio_to_markers.add_key_binding", icon = "ZOOMIN")
+        row.operator("audio_to_markers.reset_key_bindings")
+
+class AddKeyBinding(bpy.types.Operator):
+    bl_idname = "audio_to_markers.add_key_binding"
+    bl_label = "Add Key"
+    bl_description = "Add a key for the marker insertion"
+    bl_options = {"REGISTER", "INTERNAL"}
+    
+    def execute(self, context):
+        get_addon_preferences().key_bindings.add()
+        return {"FINISHED"}
+
+class RemoveKeyBinding(bpy.types.Operator):
+    bl_idname = "audio_to_markers.remove_key_binding"
+    bl_label = "Remove Key"
+    bl_description = "Remove this key"
+    bl_options = {"REGISTER", "INTERNAL"}
+    
+    index = IntProperty(default = 0)
+    
+    def execute(self, context):
+        key_bindings = get_addon_preferences().key_bindings
+        if self.index < len(key_bindings): key_bindings.remove(self.index)
+        return {"FINISHED"}
+
+class ResetKeyBindings(bpy.types.Operator):
+    bl_idname = "audio_to_markers.reset_key_bindings"
+    bl_label = "Reset Keys"
+    bl_description = "Replace the keys of the marker insertion with the default keys"
+    bl_options = {"REGISTER", "INTERNAL"}
+    
+    def execute(self, context):
+        key_bindings = get_addon_preferences().key_bindings
+        key_bindings.clear()
+        for action, event_type, event_value, shift, ctrl, alt in default_key_bindings:
+            key_binding = key_bindings.add()
+            key_binding.action = action
+            key_binding.type = event_type
+            key_binding.value = event_value
+            key_binding.shift = shift
+            key_binding.ctrl = ctrl
+            key_binding.alt = alt
+        return {"FINISHED"}
+
+# the default keys are used as long as they have not been edited
+def get_key_bindings():
+    preferences = get_addon_preferences()
+    if preferences is None or len(preferences.key_bindings) == 0:
+        return default_key_bindings
+    return [(key_binding.action, key_binding.type, key_binding.value, key_binding.shift, key_binding.ctrl, key_binding.alt)
+        for key_binding in preferences.key_bindings]
+
+def get_key_binding_help(key_bindings):
+    lines = []
+    for action, name, description in marker_insertion_actions:
+        if description == "": continue
+        for key_action, event_type, event_value, shift, ctrl, alt in key_bindings:
+            if key_action != action: continue
+            modifiers = [modifier for modifier, enabled in (("Shift", shift), ("Ctrl", ctrl), ("Alt", alt)) if enabled]
+            lines.append("{}: {}".format(" ".join(modifiers + [event_type.replace("_", " ").title()]), description))
+            break
+    return lines
+
+def get_addon_preferences():
+    user_preferences = getattr(bpy.context, "user_preferences", None) or bpy.context.preferences
+    addon = user_preferences.addons.get(__package__)
+    if addon is None: return None
+    return addon.preferences
+
+# bindings are compiled into a table that maps (type, value, shift, ctrl, alt)
+# to the first added name, bindings with the value "ANY" are stored with this value
+class EventManager:
+    def __init__(self):
+        self.events = defaultdict(list)
+        self.table = None
+        
+    def add_event(self, name, event_settings):
+        self.events[name].append(event_settings)
+        self.table = None
+        
+    def add_events(self, name, event_settings):
+        self.events[name].extend(event_settings)
+        self.table = None
+        
+    def compile(self):
+        self.table = {}
+        for order, (name, event_settings) in enumerate(self.events.items()):
+            for event_setting in event_settings:
+                self.table.setdefault(event_setting.get_key(), (order, name))
+        
+    # assumes that only one event can happen at the same time    
+    def get_name(self, event):
+        if self.table is None: self.compile()
+        key = (event.type, event.value, event.shift, event.ctrl, event.alt)
+        exact = self.table.get(key)
+        any_value = self.table.get((event.type, "ANY", event.shift, event.ctrl, event.alt))
+        if exact is None and any_value is None: return None
+        return min(result for result in (exact, any_value) if result is not None)[1]
+
+    def get_names(self, event):
+        names = []
+        for name, event_settings in self.events.items():
+            for event_setting in event_settings:
+                if event_setting.fits_event(event):
+                    names.append(name)
+                    break
+        return names
+
+class EventSettings:
+    def __init__(self, event_type, event_value, shift = False, ctrl = False, alt = False):
+        self.type = event_type
+        self.value = event_value
+        self.shift = shift
+        self.ctrl = ctrl
+        self.alt = alt
+
+    def get_key(self):
+        return (self.type, self.value, self.shift, self.ctrl, self.alt)
+
+    def fits_event(self, event):
+        return event.type == self.type and \
+                (event.value == self.value or self.value == "ANY") and \
+                event.shift == self.shift and \
+                event.ctrl == self.ctrl and \
+                event.alt == self.alt 
+        
+        
+        
+classes = (
+    KeyBinding,
+    AudioToMarkersPreferences,
+    AddKeyBinding,
+    RemoveKeyBinding,
+    ResetKeyBindings,
+    SoundStripData,
+    MarkerTime,
+    BakeData,
+    AudioToMarkersSceneSettings,
+    AudioManagerPanel,
+    SelectMusicFile,
+    LoadIntoSequenceEditor,
+    CacheSounds,
+    RemoveSoundStrips,
+    BakeAllFrequenceRanges,
+    BakeSound,
+    BakeSoundInBackground,
+    BakeSoundStrips,
+    BakeMixdown,
+    RemoveBakeData,
+    ManualMarkerInsertion,
+    RemoveAllMarkers,
+    ImportMarkers,
+    ExportMarkers,
+    UnbakeFCurve,
+    CopyBakedFCurveData,
+    PasteCopiedBakedFCurveData,
+    ExportSidecar,
+    LinkSidecar,
+    RemoveUnusedCacheFiles,
+    ExportProfile,
+    ClearProfile )
+    
+app_handlers = (
+    ("load_pre", cancel_background_bakes_handler),
+    ("undo_pre", cancel_background_bakes_handler),
+    ("redo_pre", cancel_background_bakes_handler),
+    ("load_post", sync_profiling_handler),
+    ("save_pre", remember_cache_directory_handler),
+    ("save_post", copy_cache_files_handler) )
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Scene.audio_to_markers = PointerProperty(name = "Audio to Markers", type = AudioToMarkersSceneSettings)
+    for name, handler in app_handlers:
+        getattr(bpy.app.handlers, name).append(handler)
+    from . import drivers
+    drivers.register()
+
+def unregister():
+    from . import drivers
+    drivers.unregister()
+    for name, handler in app_handlers:
+        handlers = getattr(bpy.app.handlers, name)
+        if handler in handlers:
+            handlers.remove(handler)
+    del bpy.types.Scene.audio_to_markers
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
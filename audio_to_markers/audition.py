@@ -0,0 +1,139 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import time
+
+# Audition plays the music file on a local audio device without changing the sync mode
+# of the scene. The position of a playing sound only moves once per mixing buffer, so the
+# clock interpolates between these steps and subtracts the latency to get the time that
+# is heard right now. The NullDevice behaves like a real device without making a sound.
+
+class PlaybackClock:
+    def __init__(self, get_position, extra_latency = 0.0, timer = time.perf_counter):
+        self.get_position = get_position
+        self.extra_latency = extra_latency
+        self.timer = timer
+        self.reset(0.0)
+
+    def reset(self, position):
+        self.last_position = position
+        self.last_update = self.timer()
+        self.buffer_duration = 0.0
+
+    # the smallest observed step of the position is the duration of one mixing buffer,
+    # the sound of a mixed buffer is heard while the next one is mixed
+    @property
+    def latency(self):
+        return self.buffer_duration + self.extra_latency
+
+    def get_time(self):
+        now = self.timer()
+        position = self.get_position()
+        step = position - self.last_position
+        if step != 0:
+            if 0 < step < 0.5 and (self.buffer_duration == 0 or step < self.buffer_duration):
+                self.buffer_duration = step
+            self.last_position = position
+            self.last_update = now
+        elapsed = now - self.last_update
+        if self.buffer_duration > 0: elapsed = min(elapsed, self.buffer_duration)
+        return self.last_position + elapsed - self.latency
+
+# devices define start(path, start_time), stop(), get_position() and is_playing
+class AudioDevice:
+    def __init__(self, extra_latency = 0.0, timer = time.perf_counter):
+        self.timer = timer
+        self.clock = PlaybackClock(self.get_position, extra_latency, timer)
+
+    # start_time is the position in the file in seconds
+    def play(self, path, start_time = 0.0):
+        self.start(path, start_time)
+        self.clock.reset(start_time)
+
+    # time in the file in seconds that is heard right now
+    def get_time(self):
+        return self.clock.get_time()
+
+    @property
+    def latency(self):
+        return self.clock.latency
+
+class AudDevice(AudioDevice):
+    def __init__(self, extra_latency = 0.0, timer = time.perf_counter):
+        self.handle = None
+        super().__init__(extra_latency, timer)
+
+    def start(self, path, start_time):
+        import aud
+        self.stop()
+        if hasattr(aud, "Sound"): device, sound = aud.Device(), aud.Sound(path)
+        else: device, sound = aud.device(), aud.Factory(path)
+        self.handle = device.play(sound)
+        self.handle.position = start_time
+
+    def stop(self):
+        if self.handle is not None:
+            self.handle.stop()
+            self.handle = None
+
+    def get_position(self):
+        if self.handle is None: return 0.0
+        return self.handle.position
+
+    @property
+    def is_playing(self):
+        import aud
+        if self.handle is None: return False
+        return self.handle.status == getattr(aud, "STATUS_PLAYING", getattr(aud, "AUD_STATUS_PLAYING", 1))
+
+class NullDevice(AudioDevice):
+    def __init__(self, duration = None, buffer_duration = 0.0, extra_latency = 0.0, timer = time.perf_counter):
+        self.duration = duration
+        self.buffer_duration = buffer_duration
+        self.start_time = None
+        super().__init__(extra_latency, timer)
+
+    def start(self, path, start_time):
+        self.start_time = start_time
+        self.started_at = self.timer()
+
+    def stop(self):
+        self.start_time = None
+
+    # like a real device the position is the end of the last mixed buffer
+    def get_position(self):
+        if self.start_time is None: return 0.0
+        elapsed = self.timer() - self.started_at
+        if self.buffer_duration > 0:
+            elapsed = (elapsed // self.buffer_duration + 1) * self.buffer_duration
+        position = self.start_time + elapsed
+        if self.duration is not None: position = min(position, self.duration)
+        return position
+
+    @property
+    def is_playing(self):
+        if self.start_time is None: return False
+        if self.duration is None: return True
+        return self.start_time + self.timer() - self.started_at < self.duration
+
+def create_device(extra_latency = 0.0):
+    try: import aud
+    except ImportError: return NullDevice(extra_latency = extra_latency)
+    return AudDevice(extra_latency)
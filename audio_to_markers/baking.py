@@ -0,0 +1,206 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from . import core
+from . import decoding
+from . profiling import profiler
+
+# Computes the envelopes of several frequence bands of several files in worker threads.
+# With the "FILTER" method every (file, band) pair is one task, with the "SPECTRUM"
+# method all bands of a file are computed together from one spectrum. A file is decoded once by the first of its tasks
+# and released after the last one, so only a few decoded files are in memory at once.
+# The main thread takes finished chunks with get_finished_chunks().
+
+class BakeJob:
+    def __init__(self, paths, bands, rate, chunk_frames = 256, thread_amount = None, method = "FILTER"):
+        self.paths = paths
+        self.bands = bands
+        self.rate = rate
+        self.method = method
+        self.chunk_frames = chunk_frames
+        self.thread_amount = thread_amount or os.cpu_count() or 1
+        self.task_progress = {}
+        self.error = None
+        self.finished = False
+        self.chunks = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.decoded_files = {}
+        tasks_per_file = len(bands) if method == "FILTER" else 1
+        self.remaining_tasks = {path_index: tasks_per_file for path_index in range(len(paths))}
+        self.file_locks = [threading.Lock() for path in paths]
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target = self.run)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.thread.join()
+
+    @property
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    @property
+    def progress(self):
+        task_amount = len(self.paths) * len(self.bands)
+        return sum(self.task_progress.values()) / max(task_amount, 1)
+
+    # yields (path index, band index, first frame index, values)
+    def get_finished_chunks(self):
+        while True:
+            try: yield self.chunks.get_nowait()
+            except queue.Empty: return
+
+    @property
+    def is_done(self):
+        return self.finished and self.chunks.empty()
+
+    def run(self):
+        try:
+            with ThreadPoolExecutor(max_workers = self.thread_amount) as executor:
+                if self.method == "FILTER":
+                    futures = [executor.submit(self.compute_envelope, path_index, band_index)
+                        for path_index in range(len(self.paths))
+                        for band_index in range(len(self.bands))]
+                else:
+                    futures = [executor.submit(self.compute_band_spectrum, path_index)
+                        for path_index in range(len(self.paths))]
+                for future in futures:
+                    future.result()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.decoded_files.clear()
+            self.finished = True
+
+    def compute_envelope(self, path_index, band_index):
+        if self.is_cancelled: return
+        try:
+            samples, sample_rate = self.get_decoded_file(path_index)
+            low, high = self.bands[band_index]
+            frame_amount = max(len(samples) * self.rate / sample_rate, 1)
+            with profiler.span("Filter") as span:
+                first_frame = 0
+                for values in core.iter_envelope_chunks(samples, sample_rate, low, high, self.rate, self.chunk_frames):
+                    if self.is_cancelled: return
+                    self.chunks.put((path_index, band_index, first_frame, values))
+                    first_frame += len(values)
+                    self.task_progress[(path_index, band_index)] = min(first_frame / frame_amount, 1)
+                span.add("Frames", first_frame)
+        except:
+            # stop the other tasks as soon as possible
+            self.cancel_event.set()
+            raise
+        finally:
+            self.release_decoded_file(path_index)
+
+    def compute_band_spectrum(self, path_index):
+        if self.is_cancelled: return
+        try:
+            samples, sample_rate = self.get_decoded_file(path_index)
+            frame_amount = max(len(samples) * self.rate / sample_rate, 1)
+            with profiler.span("Band Spectrum") as span:
+                for first_frame, envelopes in core.iter_spectrum_band_chunks(samples, sample_rate, self.bands, self.rate, self.chunk_frames):
+                    if self.is_cancelled: return
+                    for band_index, values in enumerate(envelopes):
+                        self.chunks.put((path_index, band_index, first_frame, values))
+                    progress = min((first_frame + len(envelopes[0])) / frame_amount, 1)
+                    for band_index in range(len(self.bands)):
+                        self.task_progress[(path_index, band_index)] = progress
+                    span.add("Frames", len(envelopes[0]))
+                span.add("Bands", len(self.bands))
+        except:
+            self.cancel_event.set()
+            raise
+        finally:
+            self.release_decoded_file(path_index)
+
+    def get_decoded_file(self, path_index):
+        with self.file_locks[path_index]:
+            if path_index not in self.decoded_files:
+                with profiler.span("Decode") as span:
+                    samples, sample_rate = decoding.read_samples(self.paths[path_index])
+                    self.decoded_files[path_index] = (core.to_mono(samples), sample_rate)
+                    span.add("Samples", len(samples))
+            return self.decoded_files[path_index]
+
+    def release_decoded_file(self, path_index):
+        with self.lock:
+            self.remaining_tasks[path_index] -= 1
+            if self.remaining_tasks[path_index] == 0:
+                self.decoded_files.pop(path_index, None)
+
+
+# Computes the envelopes of the mix of several strips in one pass over the timeline.
+# A strip is (path, offset, first, last, volume), where offset is the time of the first
+# sample and [first, last) the audible range, all in seconds from the start of the mix.
+# The chunks are reported with path index 0.
+
+class MixdownJob(BakeJob):
+    def __init__(self, strips, bands, rate, duration, chunk_frames = 256, thread_amount = None):
+        paths = []
+        for strip in strips:
+            if strip[0] not in paths: paths.append(strip[0])
+        super().__init__(paths, bands, rate, chunk_frames, thread_amount)
+        self.strips = strips
+        self.duration = duration
+        self.mixdown_progress = 0.0
+
+    @property
+    def progress(self):
+        return self.mixdown_progress
+
+    def run(self):
+        try:
+            self.compute_mixdown()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.decoded_files.clear()
+            self.finished = True
+
+    def compute_mixdown(self):
+        with ThreadPoolExecutor(max_workers = self.thread_amount) as executor:
+            sounds = list(executor.map(self.get_decoded_file, range(len(self.paths))))
+        if self.is_cancelled: return
+
+        sample_rate = max(rate for samples, rate in sounds)
+        sounds = [core.resample_samples(samples, rate, sample_rate) for samples, rate in sounds]
+        strips = []
+        for path, offset, first, last, volume in self.strips:
+            samples = sounds[self.paths.index(path)]
+            strips.append((samples, int(round(offset * sample_rate)), int(round(first * sample_rate)), int(round(last * sample_rate)), volume))
+
+        length = int(round(self.duration * sample_rate))
+        frame_amount = max(length * self.rate / sample_rate, 1)
+        with profiler.span("Mixdown") as span:
+            for first_frame, envelopes in core.iter_mixdown_envelope_chunks(strips, sample_rate, self.bands, self.rate, length, self.chunk_frames):
+                if self.is_cancelled: return
+                for band_index, values in enumerate(envelopes):
+                    self.chunks.put((0, band_index, first_frame, values))
+                self.mixdown_progress = min((first_frame + self.chunk_frames) / frame_amount, 1)
+                span.add("Frames", len(envelopes[0]))
@@ -0,0 +1,75 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import math
+
+frequence_ranges = (
+    ("0 - 20 Hz", (0, 20)),
+    ("20 - 40 Hz", (20, 40)),
+    ("40 - 80 Hz", (40, 80)),
+    ("80 - 250 Hz", (80, 250)),
+    ("250 - 600 Hz", (250, 600)),
+    ("600 - 4000 Hz", (600, 4000)),
+    ("4 - 6 kHz", (4000, 6000)),
+    ("6 - 8 kHz", (6000, 8000)),
+    ("8 - 20 kHz", (8000, 20000)) )
+
+
+# Band Sets
+################################################
+
+band_set_types = (
+    ("DEFAULT", "Default", "The frequence ranges of the addon"),
+    ("LINEAR", "Linear", "Bands with the same width"),
+    ("LOGARITHMIC", "Logarithmic", "Bands with the same width in octaves"),
+    ("MEL", "Mel", "Bands with the same width on the mel scale, similar to human hearing"),
+    ("CUSTOM", "Custom", "Comma separated list of ranges, e.g. 0-100, 100-500, 500-20000") )
+
+def create_band_set(band_set_type, amount, low, high, custom = ""):
+    if band_set_type == "DEFAULT":
+        return [frequence_range[1] for frequence_range in frequence_ranges]
+    if band_set_type == "CUSTOM":
+        return parse_bands(custom)
+    if band_set_type == "LINEAR":
+        edges = [low + (high - low) * i / amount for i in range(amount + 1)]
+    elif band_set_type == "LOGARITHMIC":
+        low = max(low, 1)
+        edges = [low * (high / low) ** (i / amount) for i in range(amount + 1)]
+    elif band_set_type == "MEL":
+        low_mel, high_mel = hertz_to_mel(low), hertz_to_mel(high)
+        edges = [mel_to_hertz(low_mel + (high_mel - low_mel) * i / amount) for i in range(amount + 1)]
+    else:
+        raise ValueError("Unknown band set type: {}".format(band_set_type))
+    return [(round(edges[i], 2), round(edges[i + 1], 2)) for i in range(amount)]
+
+def parse_bands(text):
+    bands = []
+    for part in text.split(","):
+        if part.strip() == "": continue
+        try: low, high = (float(value) for value in part.split("-"))
+        except ValueError: raise ValueError("Invalid frequence range: {}".format(part.strip()))
+        bands.append((min(low, high), max(low, high)))
+    return bands
+
+def hertz_to_mel(frequence):
+    return 2595 * math.log10(1 + frequence / 700)
+
+def mel_to_hertz(mel):
+    return 700 * (10 ** (mel / 2595) - 1)
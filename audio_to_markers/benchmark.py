@@ -0,0 +1,133 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+# Run with a normal Python interpreter:
+#     python -m audio_to_markers.benchmark
+# Exits with status 1 when an import takes longer than its budget.
+
+# (module, budget in seconds, may import numpy)
+import_budgets = (
+    ("audio_to_markers", 0.01, False),
+    ("audio_to_markers.addon", 0.05, False),
+    ("audio_to_markers.core", 0.5, True) )
+
+# outside of Blender the addon is imported with the fake Blender modules of the tests,
+# they are imported before the time is measured like bpy in Blender
+import_time_script = """
+import sys, time
+try:
+    import bpy
+    uses_fake_bpy = False
+except ImportError:
+    sys.path.insert(0, {tests_directory!r})
+    import fake_bpy
+    fake_bpy.install()
+    uses_fake_bpy = True
+start = time.perf_counter()
+import {module_name}
+print(time.perf_counter() - start)
+print("numpy" in sys.modules)
+print(uses_fake_bpy)
+"""
+
+tests_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests")
+
+def measure_import(module_name):
+    script = import_time_script.format(module_name = module_name, tests_directory = tests_directory)
+    process = subprocess.Popen([sys.executable, "-c", script],
+        stdout = subprocess.PIPE, stderr = subprocess.PIPE, universal_newlines = True)
+    output, error = process.communicate()
+    if process.returncode != 0: return None
+    duration, numpy_imported, uses_fake_bpy = output.split()
+    return float(duration), numpy_imported == "True", uses_fake_bpy == "True"
+
+def check_import_budgets():
+    all_in_budget = True
+    for module_name, budget, may_import_numpy in import_budgets:
+        result = measure_import(module_name)
+        if result is None:
+            print("import {}: skipped (not importable here)".format(module_name))
+            continue
+        duration, numpy_imported, uses_fake_bpy = result
+        in_budget = duration <= budget and (may_import_numpy or not numpy_imported)
+        all_in_budget = all_in_budget and in_budget
+        print("import {}: {:.2f} ms (budget {:.0f} ms){}{} {}".format(
+            module_name, duration * 1000, budget * 1000,
+            ", fake bpy" if uses_fake_bpy else "",
+            ", imports numpy" if numpy_imported else "",
+            "OK" if in_budget else "OVER BUDGET"))
+    return all_in_budget
+
+def best_time(function, *args, repetitions = 5):
+    durations = []
+    for i in range(repetitions):
+        start = time.perf_counter()
+        function(*args)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+def bake_spectrum_bands(samples, sample_rate, bands):
+    from . import core
+    for chunk in core.iter_spectrum_band_chunks(samples, sample_rate, bands, 24): pass
+
+def import_markers(path, existing_frames):
+    import numpy as np
+    from . import markers
+    times = [time for name, time in markers.iter_marker_times(path)]
+    markers.get_frames_to_merge(existing_frames, np.array(times) * 24, 0.5)
+
+def run_core_benchmarks():
+    import numpy as np
+    from . import core
+    from . bands import create_band_set
+    log_bands = create_band_set("LOGARITHMIC", 64, 20, 20000)
+    sample_rate = 44100
+    samples = np.random.RandomState(0).uniform(-1, 1, sample_rate * 60).astype(np.float32)
+    values = np.abs(np.sin(np.arange(1000000) * 0.01))
+    benchmarks = (
+        ("extract_envelope (60 s)", core.extract_envelope, samples, sample_rate, 80, 250, 24),
+        ("spectrum bands, 1 band (60 s)", bake_spectrum_bands, samples, sample_rate, [(80, 250)]),
+        ("spectrum bands, 64 bands (60 s)", bake_spectrum_bands, samples, sample_rate, log_bands),
+        ("find_high_frames (1M frames)", core.find_high_frames, values, 0.5),
+        ("simplify (1M points)", core.simplify, np.arange(len(values)), np.round(values, 2)) )
+    for name, function, *args in benchmarks:
+        print("{}: {:.2f} ms".format(name, best_time(function, *args) * 1000))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "markers.csv")
+        with open(path, "w") as file:
+            file.write("time\n")
+            file.writelines("{:.6f}\n".format(i * 0.05) for i in range(100000))
+        duration = best_time(import_markers, path, np.arange(0, 120000, 7))
+        print("import markers (100k lines): {:.2f} ms".format(duration * 1000))
+
+def main():
+    in_budget = check_import_budgets()
+    run_core_benchmarks()
+    return 0 if in_budget else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import math
+import numpy as np
+
+# This module must not depend on bpy so that it can be used
+# in other processes, benchmarks and pipeline tools.
+
+
+# Envelope Extraction
+################################################
+
+def extract_envelope(samples, sample_rate, low, high, rate):
+    chunks = list(iter_envelope_chunks(samples, sample_rate, low, high, rate))
+    if len(chunks) == 0: return np.zeros(0, dtype = np.float32)
+    return np.concatenate(chunks)
+
+def iter_envelope_chunks(samples, sample_rate, low, high, rate, chunk_frames = 256, padding = 0.25):
+    samples = to_mono(samples)
+    strips = [(samples, 0, 0, len(samples), 1.0)]
+    for first_frame, envelopes in iter_mixdown_envelope_chunks(strips, sample_rate, [(low, high)], rate, len(samples), chunk_frames, padding):
+        yield envelopes[0]
+
+# Streams over the mix of all strips and yields (first frame index, envelope per band)
+# in pieces of chunk_frames values so that callers can stop early.
+# Every piece is mixed and transformed once for all bands, with some padding
+# to avoid artifacts at the borders.
+# A strip is (samples, offset, first, last, volume): the samples start at offset
+# and are audible in the range [first, last), all values are sample indices of the mix.
+def iter_mixdown_envelope_chunks(strips, sample_rate, bands, rate, length, chunk_frames = 256, padding = 0.25):
+    block_size = sample_rate / rate
+    frame_amount = int(math.ceil(length / block_size))
+    padding = int(sample_rate * padding)
+    for first_frame in range(0, frame_amount, chunk_frames):
+        last_frame = min(first_frame + chunk_frames, frame_amount)
+        start = int(round(first_frame * block_size))
+        end = min(int(round(last_frame * block_size)), length)
+        padded_start = max(start - padding, 0)
+        padded_end = min(end + padding, length)
+
+        mixed = mix_samples(strips, padded_start, padded_end)
+        spectrum = np.fft.rfft(mixed)
+        frequencies = np.fft.rfftfreq(len(mixed), 1.0 / sample_rate)
+        block_starts = np.round(np.arange(first_frame, last_frame) * block_size).astype(np.int64) - start
+        block_starts = np.minimum(block_starts, end - start - 1)
+
+        envelopes = []
+        for low, high in bands:
+            band_spectrum = np.where((frequencies < low) | (frequencies > high), 0, spectrum)
+            filtered = np.fft.irfft(band_spectrum, len(mixed))
+            filtered = np.abs(filtered[start - padded_start:end - padded_start])
+            envelopes.append(np.maximum.reduceat(filtered, block_starts).astype(np.float32))
+        yield first_frame, envelopes
+
+# Computes all bands from one short time fourier transform with one window per frame,
+# which costs about the same for one or a hundred bands. A band value is the amplitude
+# of a sine wave with the same energy in the band. Bands that are narrower than the
+# frequence resolution use the closest bin.
+def iter_spectrum_band_chunks(samples, sample_rate, bands, rate, chunk_frames = 256):
+    samples = to_mono(samples)
+    block_size = sample_rate / rate
+    frame_amount = int(math.ceil(len(samples) / block_size))
+    window_size = 2 ** int(math.ceil(math.log2(max(block_size * 2, 2))))
+    window = np.hanning(window_size).astype(np.float32)
+    band_matrix = get_band_matrix(np.fft.rfftfreq(window_size, 1.0 / sample_rate), bands)
+    padded = np.concatenate((np.zeros(window_size // 2, dtype = np.float32), samples, np.zeros(window_size, dtype = np.float32)))
+    offsets = np.arange(window_size)
+
+    for first_frame in range(0, frame_amount, chunk_frames):
+        last_frame = min(first_frame + chunk_frames, frame_amount)
+        centers = np.round((np.arange(first_frame, last_frame) + 0.5) * block_size).astype(np.int64)
+        segments = padded[centers[:, np.newaxis] + offsets] * window
+        spectrum = np.fft.rfft(segments, axis = 1)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+        amplitudes = np.sqrt(np.dot(power, band_matrix) * (32 / 3)) / window_size
+        yield first_frame, [amplitudes[:, band_index] for band_index in range(len(bands))]
+
+def get_band_matrix(frequencies, bands):
+    matrix = np.zeros((len(frequencies), len(bands)), dtype = np.float32)
+    for band_index, (low, high) in enumerate(bands):
+        in_band = (frequencies >= low) & (frequencies < high)
+        if in_band.any(): matrix[in_band, band_index] = 1
+        else: matrix[np.abs(frequencies - (low + high) / 2).argmin(), band_index] = 1
+    return matrix
+
+def mix_samples(strips, start, end):
+    mixed = np.zeros(end - start, dtype = np.float32)
+    for samples, offset, first, last, volume in strips:
+        mix_start = max(start, first, offset)
+        mix_end = min(end, last, offset + len(samples))
+        if mix_start < mix_end:
+            mixed[mix_start - start:mix_end - start] += samples[mix_start - offset:mix_end - offset] * volume
+    return mixed
+
+def resample_samples(samples, sample_rate, new_sample_rate):
+    if sample_rate == new_sample_rate: return samples
+    amount = int(round(len(samples) * new_sample_rate / sample_rate))
+    positions = np.arange(amount) * (sample_rate / new_sample_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+def to_mono(samples):
+    samples = np.asarray(samples, dtype = np.float32)
+    if samples.ndim == 2: return samples.mean(axis = 1)
+    return samples
+
+
+# Peak Picking
+################################################
+
+def highest_values(*sampled_values):
+    return np.maximum.reduce([np.asarray(values, dtype = np.float64) for values in sampled_values])
+
+# values[i] is the highest value of the i-th frame, returns indices of frames
+# where the curve starts to fall above the threshold, after a frame below the
+# threshold a new peak can be found
+def find_high_frames(values, threshold):
+    values = np.asarray(values)
+    if len(values) < 2: return np.zeros(0, dtype = np.int64)
+    value, next_value = values[:-1], values[1:]
+    is_peak = (value > next_value) & (next_value > threshold)
+    peaks = np.flatnonzero(is_peak)
+    if len(peaks) == 0: return peaks
+    sections = np.cumsum(value < threshold)[peaks]
+    is_first_in_section = np.ones(len(peaks), dtype = bool)
+    is_first_in_section[1:] = sections[1:] != sections[:-1]
+    return peaks[is_first_in_section]
+
+# like find_high_frames but the peaks are moved to the top of a parabola
+# through the neighbouring values, returns float indices
+# With a width above 1 the peaks are found on the running maximum of that many values,
+# so that an envelope that still follows the periods of a low frequence has one peak per hit.
+def find_precise_peaks(values, threshold, width = 1):
+    values = np.asarray(values, dtype = np.float64)
+    if width <= 1:
+        peaks = find_high_frames(values, threshold)
+    else:
+        peaks = find_high_frames(running_max(values, width), threshold)
+        # the running maximum holds a peak for width values, the peak is the highest value before
+        windows = np.maximum(peaks[:, np.newaxis] + np.arange(1 - width, 1), 0)
+        peaks = windows[np.arange(len(peaks)), np.argmax(values[windows], axis = 1)] if len(peaks) > 0 else peaks
+    return peaks + parabolic_offsets(values, peaks)
+
+# the highest of the last width values at every index
+def running_max(values, width):
+    result = np.array(values)
+    for offset in range(1, min(width, len(values))):
+        result[offset:] = np.maximum(result[offset:], values[:-offset])
+    return result
+
+def parabolic_offsets(values, indices):
+    indices = np.asarray(indices, dtype = np.int64)
+    inner = (indices > 0) & (indices < len(values) - 1)
+    offsets = np.zeros(len(indices), dtype = np.float64)
+    before, center, after = values[indices[inner] - 1], values[indices[inner]], values[indices[inner] + 1]
+    curvature = before - 2 * center + after
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        offsets[inner] = np.where(curvature < 0, 0.5 * (before - after) / curvature, 0)
+    return np.clip(offsets, -0.5, 0.5)
+
+
+# Smoothing
+################################################
+
+# all stages work on one value per frame, in this order:
+# moving average, attack/release, gate, compression, normalization
+def process_envelope(values, smoothing = 0, attack = 0, release = 0, gate = 0,
+        compression_threshold = 1, compression_ratio = 1, normalize = False):
+    values = np.asarray(values, dtype = np.float32)
+    if len(values) == 0: return values
+    if smoothing > 1: values = moving_average(values, int(round(smoothing)))
+    if attack > 0 or release > 0: values = attack_release(values, attack, release)
+    if gate > 0: values = np.where(values < gate, 0, values)
+    if compression_ratio != 1:
+        above = values > compression_threshold
+        values = np.where(above, compression_threshold + (values - compression_threshold) / compression_ratio, values)
+    if normalize:
+        highest = np.abs(values).max()
+        if highest > 0: values = values / highest
+    return values.astype(np.float32)
+
+def moving_average(values, width):
+    padded = np.pad(np.asarray(values, dtype = np.float64), (width // 2, width - 1 - width // 2), mode = "edge")
+    sums = np.cumsum(np.concatenate(([0.0], padded)))
+    return ((sums[width:] - sums[:-width]) / width).astype(np.float32)
+
+# follows rising values with the attack and falling values with the release time,
+# both are given in values (e.g. frames), 0 follows immediately
+def attack_release(values, attack, release):
+    attack_factor = 1 - math.exp(-1 / attack) if attack > 0 else 1
+    release_factor = 1 - math.exp(-1 / release) if release > 0 else 1
+    result = []
+    current = 0.0
+    for value in np.asarray(values, dtype = np.float64).tolist():
+        factor = attack_factor if value > current else release_factor
+        current += (value - current) * factor
+        result.append(current)
+    return np.array(result, dtype = np.float32)
+
+
+# Simplification
+################################################
+
+# keeps the points whose value differs from the previous point
+def simplify(frames, values):
+    frames = np.asarray(frames)
+    values = np.asarray(values)
+    changed = np.flatnonzero(values[1:] != values[:-1]) + 1
+    return frames[changed], values[changed]
+
+def resample(frames, values, new_frames):
+    return np.interp(new_frames, frames, values)
+
+# evaluates values with one value per frame like a fcurve with sampled points
+def evaluate_per_frame_values(first_frame, values, frames):
+    return np.interp(frames, np.arange(len(values)) + first_frame, values)
@@ -0,0 +1,70 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import os
+import wave
+import numpy as np
+
+# Blender 2.8 and newer can decode every supported format with aud.Sound.data(),
+# otherwise only uncompressed wave files can be read.
+
+def read_samples(path):
+    if has_aud_sound_data():
+        import aud
+        sound = aud.Sound(path)
+        sample_rate = sound.specs[0]
+        return np.asarray(sound.data(), dtype = np.float32), sample_rate
+    if is_wave_file(path):
+        return read_wave_file(path)
+    raise ValueError("Cannot decode {} without aud.Sound.data()".format(os.path.basename(path)))
+
+def can_read(path):
+    return os.path.isfile(path) and (has_aud_sound_data() or is_wave_file(path))
+
+def has_aud_sound_data():
+    try: import aud
+    except ImportError: return False
+    return hasattr(aud, "Sound") and hasattr(aud.Sound, "data")
+
+def is_wave_file(path):
+    return os.path.splitext(path)[1].lower() == ".wav"
+
+# returns an array with the shape (sample amount, channel amount) in the range -1 to 1
+def read_wave_file(path):
+    with wave.open(path, "rb") as file:
+        channel_amount = file.getnchannels()
+        sample_width = file.getsampwidth()
+        sample_rate = file.getframerate()
+        data = file.readframes(file.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(data, dtype = np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        samples = np.frombuffer(data, dtype = "<i2").astype(np.float32) / 2 ** 15
+    elif sample_width == 3:
+        raw = np.frombuffer(data, dtype = np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        values[values >= 2 ** 23] -= 2 ** 24
+        samples = values.astype(np.float32) / 2 ** 23
+    elif sample_width == 4:
+        samples = np.frombuffer(data, dtype = "<i4").astype(np.float32) / 2 ** 31
+    else:
+        raise ValueError("Unsupported sample width: {} bytes".format(sample_width))
+    return samples.reshape(-1, channel_amount), sample_rate
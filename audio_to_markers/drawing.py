@@ -0,0 +1,159 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import bgl
+import blf
+from bgl import (glBegin, glEnd, glColor4f, GL_POLYGON, glVertex2f, glEnable,
+    GL_BLEND, GL_POINTS, glPointSize, GL_LINES, glLineWidth)
+from mathutils import Vector
+
+
+def draw_dot(position, size, color):
+    glColor4f(*color)
+    glEnable(GL_BLEND)
+    glPointSize(size)
+    glBegin(GL_POINTS)
+    glVertex2f(*position)
+    glEnd()
+
+def draw_text(text, position, size, color = (0.9, 0.9, 0.9, 1.0)):
+    font_id = 0
+    glColor4f(*color)
+    blf.size(font_id, size, 80)
+    blf.position(font_id, position[0], position[1], 0)
+    blf.draw(font_id, text)
+
+class Line:
+    def __init__(self):
+        self.start = Vector((0, 0))
+        self.end = Vector((0, 0))
+        
+    def set_start(self, event):
+        self.start = Vector((event.mouse_region_x, event.mouse_region_y))
+    def set_end(self, event):
+        self.end = Vector((event.mouse_region_x, event.mouse_region_y))
+        
+    def draw(self, thickness = 2, color = (0.2, 0.2, 0.2, 1.0)):
+        glLineWidth(thickness)
+        glColor4f(*color)
+        glBegin(GL_LINES)
+        glVertex2f(*self.start)
+        glVertex2f(*self.end)
+        glEnd()   
+        glLineWidth(1)   
+        
+class Rectangle:
+    def __init__(self):
+        self.top = 1000
+        self.bottom = 0
+        self.left = 0
+        self.right = 1000
+        self.color = (0.2, 0.2, 0.2, 1.0)
+        self.border_color = (0.0, 0.0, 0.0, 1.0)
+        self.border_thickness = 0
+        
+    def draw(self):
+        top_left = (self.left, self.top)
+        top_right = (self.right, self.top)
+        bottom_left = (self.left, self.bottom)
+        bottom_right = (self.right, self.bottom)
+        
+        glEnable(GL_BLEND)
+        glColor4f(*self.color)
+        glBegin(GL_POLYGON)
+        for x, y in [top_left, top_right, bottom_right, bottom_left]:
+            glVertex2f(x, y)
+        glEnd() 
+        
+        lines = [
+            (top_left, top_right), 
+            (top_right, bottom_right), 
+            (bottom_right, bottom_left), 
+            (bottom_left, top_left) ]
+        glBegin(GL_LINES)
+        for start, end in lines:
+            draw_line(start, end, self.border_thickness, self.border_color)
+        glEnd()
+        
+        
+def draw_line(start, end, thickness, color):
+    glLineWidth(thickness)
+    glColor4f(*color)
+    glBegin(GL_LINES)
+    glVertex2f(*start)
+    glVertex2f(*end)
+    glEnd()   
+    glLineWidth(1)
+
+
+# Spectrogram
+################################################
+
+# textures are kept until another spectrogram is drawn, the key is (level, tile index)
+spectrogram_textures = {}
+textures_spectrogram = None
+
+def draw_spectrogram_tile(spectrogram, level, tile_index, left, right, bottom, top):
+    texture = get_spectrogram_texture(spectrogram, level, tile_index)
+    glEnable(GL_BLEND)
+    bgl.glEnable(bgl.GL_TEXTURE_2D)
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, texture)
+    glColor4f(1.0, 1.0, 1.0, 1.0)
+    glBegin(bgl.GL_QUADS)
+    for (u, v), (x, y) in (((0, 0), (left, bottom)), ((1, 0), (right, bottom)), ((1, 1), (right, top)), ((0, 1), (left, top))):
+        bgl.glTexCoord2f(u, v)
+        glVertex2f(x, y)
+    glEnd()
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, 0)
+    bgl.glDisable(bgl.GL_TEXTURE_2D)
+
+def get_spectrogram_texture(spectrogram, level, tile_index):
+    global textures_spectrogram
+    if textures_spectrogram is not spectrogram:
+        free_spectrogram_textures()
+        textures_spectrogram = spectrogram
+    key = (level, tile_index)
+    if key not in spectrogram_textures:
+        spectrogram_textures[key] = create_texture(spectrogram.get_tile_colors(level, tile_index))
+    return spectrogram_textures[key]
+
+# colors is a float array with the shape (height, width, 4)
+def create_texture(colors):
+    height, width = colors.shape[:2]
+    textures = bgl.Buffer(bgl.GL_INT, 1)
+    bgl.glGenTextures(1, textures)
+    texture = textures[0]
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, texture)
+    bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
+    bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_LINEAR)
+    bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_S, bgl.GL_CLAMP_TO_EDGE)
+    bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_T, bgl.GL_CLAMP_TO_EDGE)
+    buffer = bgl.Buffer(bgl.GL_FLOAT, colors.size, colors.ravel().tolist())
+    bgl.glTexImage2D(bgl.GL_TEXTURE_2D, 0, bgl.GL_RGBA, width, height, 0, bgl.GL_RGBA, bgl.GL_FLOAT, buffer)
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, 0)
+    return texture
+
+def free_spectrogram_textures():
+    global textures_spectrogram
+    if len(spectrogram_textures) > 0:
+        textures = list(spectrogram_textures.values())
+        bgl.glDeleteTextures(len(textures), bgl.Buffer(bgl.GL_INT, len(textures), textures))
+    spectrogram_textures.clear()
+    textures_spectrogram = None
@@ -0,0 +1,101 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import bpy
+from bpy.app.handlers import persistent
+from . import addon
+from . bands import frequence_ranges
+
+# Drivers can use atm_band(name, frame) to read baked values, e.g.
+#     atm_band("80 - 250 Hz", frame)
+#     atm_band("music.wav: 80 - 250 Hz", frame, attack = 2, release = 10)
+#     atm_band(3, frame)
+# The name is a frequence range of the current sound, the label of a bake item
+# or its index. Attack and release are in frames. The values are loaded into a list
+# when a band is used the first time in a scene, so that every call is a simple lookup.
+
+driver_function_name = "atm_band"
+frequence_range_dict = dict(frequence_ranges)
+loaded_bands = {}
+
+def band_value(name, frame, attack = 0, release = 0):
+    # every scene has its own bake data
+    key = (bpy.context.scene.name, name, attack, release)
+    band = loaded_bands.get(key)
+    if band is None:
+        band = load_band(name, attack, release)
+        loaded_bands[key] = band
+    first_frame, values = band
+
+    position = frame - first_frame
+    if position <= 0: return values[0]
+    index = int(position)
+    if index >= len(values) - 1: return values[-1]
+    fraction = position - index
+    return values[index] * (1 - fraction) + values[index + 1] * fraction
+
+def load_band(name, attack, release):
+    index = find_bake_data_index(name)
+    if index == -1: return (0, [0.0])
+    item = bpy.context.scene.audio_to_markers.bake_data[index]
+    stored_values = addon.get_processed_values(item)
+    if stored_values is None:
+        fcurve = addon.get_fcurve_from_bake_data_index(index)
+        if not fcurve or addon.get_fcurve_point_amount(fcurve) == 0: return (0, [0.0])
+        stored_values = addon.get_fcurve_values_per_frame(fcurve)
+    first_frame, values = stored_values
+    if len(values) == 0: return (0, [0.0])
+    if attack > 0 or release > 0:
+        from . import core
+        values = core.attack_release(values, attack, release)
+    return first_frame, values.tolist()
+
+def find_bake_data_index(name):
+    settings = bpy.context.scene.audio_to_markers
+    if isinstance(name, int):
+        return name if 0 <= name < len(settings.bake_data) else -1
+    for index, item in enumerate(settings.bake_data):
+        if addon.get_bake_item_label(item) == name: return index
+    if name in frequence_range_dict:
+        return addon.get_bake_item_index(settings.path, *frequence_range_dict[name])
+    return -1
+
+def clear_loaded_bands():
+    loaded_bands.clear()
+
+# undo and redo can link the bake items to other values
+@persistent
+def clear_loaded_bands_handler(dummy):
+    clear_loaded_bands()
+
+handler_lists = ("load_post", "undo_post", "redo_post")
+
+def register():
+    bpy.app.driver_namespace[driver_function_name] = band_value
+    for name in handler_lists:
+        getattr(bpy.app.handlers, name).append(clear_loaded_bands_handler)
+
+def unregister():
+    bpy.app.driver_namespace.pop(driver_function_name, None)
+    for name in handler_lists:
+        handlers = getattr(bpy.app.handlers, name)
+        if clear_loaded_bands_handler in handlers:
+            handlers.remove(clear_loaded_bands_handler)
+    clear_loaded_bands()
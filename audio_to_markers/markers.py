@@ -0,0 +1,224 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import os
+import csv
+import gzip
+import json
+import math
+
+# Reads and writes marker timestamps for other tools. A marker is a (name, time) tuple,
+# the time is given in seconds. Imported names can be empty.
+
+export_formats = [
+    ("CSV", "CSV", "name and time per line"),
+    ("JSON", "JSON", "list of objects with name and time"),
+    ("EDL", "EDL", "CMX 3600 edit decision list with one locator per marker") ]
+
+def get_format_from_path(path):
+    extension = os.path.splitext(path)[1].lower()
+    return {".json" : "JSON", ".edl" : "EDL"}.get(extension, "CSV")
+
+def write_markers(path, markers, fps, format = None):
+    if format is None: format = get_format_from_path(path)
+    if format == "JSON": text = markers_to_json(markers)
+    elif format == "EDL": text = markers_to_edl(markers, fps)
+    else: text = markers_to_csv(markers)
+    with open(path, "w", newline = "") as file:
+        file.write(text)
+
+def markers_to_csv(markers):
+    lines = ["name,time"]
+    lines.extend("{},{:.6f}".format(quote_csv(name), time) for name, time in markers)
+    return "\n".join(lines) + "\n"
+
+def quote_csv(text):
+    if any(character in text for character in ',"\n'):
+        return '"{}"'.format(text.replace('"', '""'))
+    return text
+
+def markers_to_json(markers):
+    return json.dumps([{"name" : name, "time" : round(time, 6)} for name, time in markers], indent = 1)
+
+def markers_to_edl(markers, fps):
+    timecode_fps = int(round(fps))
+    lines = ["TITLE: Markers", "FCM: NON-DROP FRAME", ""]
+    for i, (name, time) in enumerate(markers):
+        start = to_timecode(time, timecode_fps)
+        end = to_timecode(time + 1 / timecode_fps, timecode_fps)
+        lines.append("{:03d}  AX       V     C        {} {} {} {}".format(i + 1, start, end, start, end))
+        lines.append("* LOC: {} RED     {}".format(start, name.replace("\n", " ")))
+        lines.append("")
+    return "\n".join(lines)
+
+def to_timecode(time, fps):
+    frames = int(round(max(time, 0) * fps))
+    seconds, frame = divmod(frames, fps)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return "{:02d}:{:02d}:{:02d}:{:02d}".format(hour, minute, second, frame)
+
+
+# Import
+################################################
+
+# text files can be separated by commas, semicolons or tabs, the first number in a line
+# is the time and the first other field the name, so that headers are skipped and
+# also Audacity labels can be read, the track is only used by files with several tracks
+def iter_marker_times(path, track = ""):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".xml": return iter_rekordbox_times(path, track)
+    if extension == ".als": return iter_ableton_times(path, track)
+    if extension == ".json": return iter_json_times(path)
+    return iter_text_times(path)
+
+def iter_text_times(path):
+    with open(path, newline = "") as file:
+        first_line = file.readline()
+        file.seek(0)
+        if "\t" in first_line: delimiter = "\t"
+        elif ";" in first_line and "," not in first_line: delimiter = ";"
+        else: delimiter = ","
+        for fields in csv.reader(file, delimiter = delimiter):
+            time = None
+            name = ""
+            for field in fields:
+                field = field.strip()
+                try: number = float(field)
+                except ValueError:
+                    if name == "": name = field
+                    continue
+                if time is None: time = number
+            if time is not None: yield name, time
+
+def iter_json_times(path):
+    with open(path) as file:
+        data = json.load(file)
+    for entry in data:
+        if isinstance(entry, dict): yield entry.get("name", ""), float(entry["time"])
+        else: yield "", float(entry)
+
+# a track or clip is selected by its name or the name of its sound file,
+# without a match the only one with markers is used
+def iter_selected_times(sources, track):
+    names = []
+    only_times = None
+    for source_names, get_times in sources:
+        if track != "" and any(is_track_name(name, track) for name in source_names):
+            yield from get_times()
+            return
+        names.append(next((name for name in source_names if name != ""), "?"))
+        only_times = get_times
+    if len(names) == 1:
+        yield from only_times()
+    elif len(names) > 1:
+        raise ValueError("No track matches '{}', the file contains: {}".format(track, ", ".join(names)))
+
+def is_track_name(name, track):
+    name, track = name.lower(), track.lower()
+    return name == track or os.path.splitext(name)[0] == os.path.splitext(track)[0]
+
+# uses the beat grid and the cue points of a track
+def iter_rekordbox_times(path, track = ""):
+    return iter_selected_times(iter_rekordbox_tracks(path), track)
+
+def iter_rekordbox_tracks(path):
+    import functools
+    import xml.etree.ElementTree as ElementTree
+    from urllib.parse import unquote
+    for event, element in ElementTree.iterparse(path):
+        if element.tag != "TRACK": continue
+        tempos = [(float(tempo.get("Inizio")), float(tempo.get("Bpm"))) for tempo in element.iter("TEMPO")]
+        cues = [(cue.get("Name", ""), float(cue.get("Start"))) for cue in element.iter("POSITION_MARK")]
+        if len(tempos) > 0 or len(cues) > 0:
+            location = unquote(element.get("Location", "")).replace("\\", "/")
+            names = [element.get("Name", ""), os.path.basename(location)]
+            yield names, functools.partial(iter_beat_grid_times, tempos, cues, float(element.get("TotalTime", 0)))
+        element.clear()
+
+def iter_beat_grid_times(tempos, cues, end):
+    end = max([end] + [start for start, bpm in tempos] + [time for name, time in cues])
+    tempos = sorted(tempos)
+    for i, (start, bpm) in enumerate(tempos):
+        segment_end = tempos[i + 1][0] if i + 1 < len(tempos) else end
+        if bpm <= 0: continue
+        beat_duration = 60 / bpm
+        for beat in range(int(math.ceil((segment_end - start) / beat_duration - 1e-9))):
+            yield "", start + beat * beat_duration
+    yield from cues
+
+# Ableton Live sets are gzipped xml, the warp markers of a clip
+# map beats to seconds, a marker is created on every beat between them
+def iter_ableton_times(path, track = ""):
+    return iter_selected_times(iter_ableton_clips(path), track)
+
+def iter_ableton_clips(path):
+    import functools
+    import xml.etree.ElementTree as ElementTree
+    with gzip.open(path) as file:
+        for event, element in ElementTree.iterparse(file):
+            warp_markers_element = element.find("WarpMarkers")
+            if warp_markers_element is None: continue
+            warp_markers = sorted((float(marker.get("BeatTime")), float(marker.get("SecTime")))
+                for marker in warp_markers_element.iter("WarpMarker"))
+            if len(warp_markers) >= 2:
+                names = [get_ableton_value(element, "Name")]
+                for file_reference in element.iter("FileRef"):
+                    names.append(os.path.basename(get_ableton_value(file_reference, "Path").replace("\\", "/")))
+                    names.append(get_ableton_value(file_reference, "Name"))
+                yield names, functools.partial(iter_warp_marker_times, warp_markers)
+            element.clear()
+
+def get_ableton_value(element, tag):
+    child = element.find(tag)
+    return child.get("Value", "") if child is not None else ""
+
+def iter_warp_marker_times(warp_markers):
+    for beat in range(int(math.ceil(warp_markers[0][0])), int(math.floor(warp_markers[-1][0])) + 1):
+        for (beat_time, sec_time), (next_beat_time, next_sec_time) in zip(warp_markers, warp_markers[1:]):
+            if beat_time <= beat <= next_beat_time:
+                factor = (beat - beat_time) / (next_beat_time - beat_time) if next_beat_time > beat_time else 0
+                yield "", sec_time + factor * (next_sec_time - sec_time)
+                break
+
+# returns the indices of the new frames that are further than the tolerance away from
+# existing frames and from the previously kept new frame, in sorted order
+def get_frames_to_merge(existing_frames, new_frames, tolerance):
+    import numpy as np
+    existing_frames = np.sort(np.asarray(existing_frames, dtype = np.float64))
+    new_frames = np.asarray(new_frames, dtype = np.float64)
+    order = np.argsort(new_frames, kind = "mergesort")
+    sorted_frames = new_frames[order]
+
+    keep = np.ones(len(sorted_frames), dtype = bool)
+    if len(existing_frames) > 0:
+        positions = np.searchsorted(existing_frames, sorted_frames)
+        before = existing_frames[np.maximum(positions - 1, 0)]
+        after = existing_frames[np.minimum(positions, len(existing_frames) - 1)]
+        distance = np.minimum(np.abs(sorted_frames - before), np.abs(after - sorted_frames))
+        keep = distance > tolerance
+    # the sequential check is only needed when some frames are close to their predecessor
+    if (np.diff(sorted_frames) <= tolerance).any():
+        last_kept = None
+        for i, frame in enumerate(sorted_frames.tolist()):
+            if not keep[i]: continue
+            if last_kept is not None and frame - last_kept <= tolerance: keep[i] = False
+            else: last_kept = frame
+    return order[keep]
@@ -0,0 +1,105 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import time
+import threading
+from collections import deque, defaultdict, OrderedDict
+
+max_span_amount = 10000
+
+
+# spans are added by the bake threads too, so the spans are only read from a copy
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.clear()
+        
+    def clear(self):
+        with self.lock:
+            self.spans = deque(maxlen = max_span_amount)
+            self.start_time = time.perf_counter()
+            
+    def add_span(self, span):
+        with self.lock:
+            self.spans.append(span)
+            
+    def get_spans(self):
+        with self.lock:
+            return list(self.spans)
+        
+    # returns a span that does nothing when profiling is disabled    
+    def span(self, name):
+        if self.enabled: return ProfilingSpan(self, name)
+        return disabled_span
+        
+    def get_summary(self):
+        summary = OrderedDict()
+        for span in self.get_spans():
+            amount, duration, counters = summary.get(span.name, (0, 0.0, defaultdict(int)))
+            for counter_name, value in span.counters.items():
+                counters[counter_name] += value
+            summary[span.name] = (amount + 1, duration + span.duration, counters)
+        return [(name, amount, duration, counters) for name, (amount, duration, counters) in summary.items()]
+        
+    def to_chrome_trace(self):
+        events = []
+        for span in self.get_spans():
+            events.append({
+                "name" : span.name,
+                "cat" : "audio_to_markers",
+                "ph" : "X",
+                "ts" : (span.start - self.start_time) * 1000000,
+                "dur" : span.duration * 1000000,
+                "pid" : 0,
+                "tid" : span.thread_id,
+                "args" : dict(span.counters) })
+        return {"traceEvents" : events, "displayTimeUnit" : "ms"}
+    
+class ProfilingSpan:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.counters = {}
+        self.thread_id = threading.get_ident()
+        
+    def add(self, counter_name, amount = 1):
+        self.counters[counter_name] = self.counters.get(counter_name, 0) + amount
+        
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, type, value, traceback):
+        self.duration = time.perf_counter() - self.start
+        self.profiler.add_span(self)
+        
+class DisabledProfilingSpan:
+    def add(self, counter_name, amount = 1):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, type, value, traceback):
+        pass
+        
+disabled_span = DisabledProfilingSpan()
+profiler = Profiler()
@@ -0,0 +1,144 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import os
+import math
+import json
+import hashlib
+import struct
+import numpy as np
+
+# Sidecar Envelope Files
+################################################
+#
+# A sidecar file holds the envelopes of several frequence bands at a known rate,
+# so that they can be memory mapped and shared between scenes, files and tools.
+# All numbers are little endian.
+#
+#   offset  size  content
+#   0       8     magic bytes b"ATMENV01"
+#   8       4     uint32, offset of the values in bytes (a multiple of 64)
+#   12      4     uint32, band amount
+#   16      8     uint64, value amount per band
+#   24      8     float64, rate in values per second
+#   32      4     4 ascii characters, numpy type of the values ("<f4 " or "<f2 ")
+#   36      4     uint32, length of the metadata in bytes
+#   40      n     utf-8 json metadata, e.g.
+#                 {"bands": [[low, high], ...], "source": "music.wav", "start_frame": 1,
+#                  "methods": ["FILTER", ...]}
+#   offset        band amount * value amount values, one contiguous array per band
+
+magic = b"ATMENV01"
+header_format = "<8sIIQd4sI"
+header_size = struct.calcsize(header_format)
+alignment = 64
+
+extension = ".atmenv"
+
+opened_sidecars = {}
+
+class Sidecar:
+    def __init__(self, path, values, rate, metadata):
+        self.path = path
+        self.values = values
+        self.rate = rate
+        self.metadata = metadata
+
+    @property
+    def bands(self):
+        return [tuple(band) for band in self.metadata.get("bands", [])]
+
+# values has the shape (band amount, value amount)
+# the file is written next to the old one and replaces it at the end, so that a failed
+# write keeps the old file and mappings of the old file are never truncated
+def write_sidecar(path, values, rate, metadata, value_type = "<f4"):
+    values = np.asarray(values, dtype = np.dtype(value_type))
+    # a mapping of the old file must not be used anymore
+    opened_sidecars.pop(os.path.abspath(path), None)
+    metadata_bytes = json.dumps(metadata).encode("utf-8")
+    offset = int(math.ceil((header_size + len(metadata_bytes)) / alignment)) * alignment
+    header = struct.pack(header_format, magic, offset, values.shape[0], values.shape[1],
+        rate, value_type.ljust(4).encode("ascii"), len(metadata_bytes))
+    temporary_path = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        with open(temporary_path, "wb") as file:
+            file.write(header)
+            file.write(metadata_bytes)
+            file.write(b"\0" * (offset - header_size - len(metadata_bytes)))
+            file.write(values.tobytes())
+        os.replace(temporary_path, path)
+    except:
+        if os.path.exists(temporary_path): os.remove(temporary_path)
+        raise
+
+# the values are memory mapped and shared by all callers that open the same file
+def open_sidecar(path):
+    path = os.path.abspath(path)
+    modification_time = os.path.getmtime(path)
+    cached = opened_sidecars.get(path)
+    if cached is not None and cached[0] == modification_time:
+        return cached[1]
+
+    with open(path, "rb") as file:
+        header = file.read(header_size)
+        if len(header) < header_size or not header.startswith(magic):
+            raise ValueError("{} is not a sidecar envelope file".format(os.path.basename(path)))
+        _, offset, band_amount, value_amount, rate, value_type, metadata_length = struct.unpack(header_format, header)
+        metadata = json.loads(file.read(metadata_length).decode("utf-8"))
+
+    dtype = np.dtype(value_type.decode("ascii").strip())
+    if band_amount * value_amount == 0:
+        values = np.zeros((band_amount, value_amount), dtype = dtype)
+    else:
+        values = np.memmap(path, dtype = dtype, mode = "r", offset = offset, shape = (band_amount, value_amount))
+    sidecar = Sidecar(path, values, rate, metadata)
+    opened_sidecars[path] = (modification_time, sidecar)
+    return sidecar
+
+
+# Content Addressed Files
+################################################
+#
+# The name of a cached file is the hash of its content, so that a file never changes
+# once it is written. A reference to it stays valid as long as the file exists,
+# e.g. in undo steps that only remember the file name.
+
+def write_cached_values(directory, values, rate, metadata, value_type = "<f4"):
+    values = np.asarray(values, dtype = np.dtype(value_type))
+    digest = hashlib.sha1(values.tobytes())
+    digest.update(json.dumps([rate, values.shape, metadata], sort_keys = True).encode("utf-8"))
+    name = digest.hexdigest()[:24] + extension
+    path = os.path.join(directory, name)
+    if not os.path.isfile(path):
+        os.makedirs(directory, exist_ok = True)
+        write_sidecar(path, values, rate, metadata, value_type)
+    return name
+
+def remove_unused_cached_files(directory, used_names):
+    removed_amount = 0
+    if not os.path.isdir(directory): return removed_amount
+    for name in os.listdir(directory):
+        if name.endswith(extension) and name not in used_names:
+            path = os.path.join(directory, name)
+            opened_sidecars.pop(os.path.abspath(path), None)
+            try: os.remove(path)
+            except OSError: continue
+            removed_amount += 1
+    return removed_amount
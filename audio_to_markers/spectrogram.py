@@ -0,0 +1,119 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import math
+import os
+import threading
+import numpy as np
+from . import core
+from . import decoding
+from . bands import create_band_set
+
+# A spectrogram is computed once per file in a background thread. It is stored
+# as several levels, every level has half the horizontal resolution of the previous one,
+# and every level is split into tiles of tile_size frames that can be drawn independently.
+
+tile_size = 256
+band_amount = 128
+decibel_range = 60
+
+spectrograms = {}
+errors = {}
+lock = threading.Lock()
+
+class Spectrogram:
+    def __init__(self, levels):
+        self.levels = levels
+
+    # chooses the level with about one column per pixel
+    def get_level(self, frames_per_pixel):
+        if frames_per_pixel <= 1: return 0
+        return min(int(math.log2(frames_per_pixel)), len(self.levels) - 1)
+
+    # yields (tile index, first frame, last frame) of the tiles in the frame range
+    def get_visible_tiles(self, level, start_frame, end_frame):
+        factor = 2 ** level
+        column_amount = len(self.levels[level])
+        first_tile = max(int(start_frame / factor) // tile_size, 0)
+        last_tile = min(int(end_frame / factor) // tile_size, (column_amount - 1) // tile_size)
+        tiles = []
+        for tile_index in range(first_tile, last_tile + 1):
+            first_column = tile_index * tile_size
+            last_column = min(first_column + tile_size, column_amount)
+            tiles.append((tile_index, first_column * factor, last_column * factor))
+        return tiles
+
+    # returns rgba colors with the shape (band amount, columns, 4)
+    def get_tile_colors(self, level, tile_index):
+        values = self.levels[level][tile_index * tile_size:(tile_index + 1) * tile_size]
+        intensity = values.T.astype(np.float32) / 255
+        colors = np.empty(intensity.shape + (4, ), dtype = np.float32)
+        colors[..., 0] = np.minimum(intensity * 2, 1)
+        colors[..., 1] = np.maximum(intensity * 2 - 1, 0)
+        colors[..., 2] = 0.4 * intensity * (1 - intensity)
+        colors[..., 3] = intensity * 0.7
+        return colors
+
+def compute_spectrogram(path, rate):
+    samples, sample_rate = decoding.read_samples(path)
+    bands = create_band_set("LOGARITHMIC", band_amount, 20, min(20000, sample_rate / 2))
+    chunks = [np.stack(envelopes, axis = 1) for first_frame, envelopes in core.iter_spectrum_band_chunks(samples, sample_rate, bands, rate)]
+    if len(chunks) == 0: return Spectrogram([np.zeros((1, band_amount), dtype = np.uint8)])
+    amplitudes = np.concatenate(chunks)
+
+    decibels = 20 * np.log10(np.maximum(amplitudes, 1e-9) / max(amplitudes.max(), 1e-9))
+    level = np.round(np.clip(decibels / decibel_range + 1, 0, 1) * 255).astype(np.uint8)
+    levels = [level]
+    while len(level) > tile_size:
+        if len(level) % 2 == 1: level = np.concatenate((level, level[-1:]))
+        level = np.maximum(level[0::2], level[1::2])
+        levels.append(level)
+    return Spectrogram(levels)
+
+# returns None while the spectrogram is computed or when it failed
+def get_spectrogram(path, rate):
+    if not os.path.isfile(path): return None
+    key = get_key(path, rate)
+    with lock:
+        if key not in spectrograms:
+            spectrograms[key] = None
+            thread = threading.Thread(target = compute_in_background, args = (key, ))
+            thread.daemon = True
+            thread.start()
+        return spectrograms[key]
+
+# returns the error message when the spectrogram cannot be computed
+def get_error(path, rate):
+    if not os.path.isfile(path): return None
+    with lock:
+        return errors.get(get_key(path, rate))
+
+def get_key(path, rate):
+    return (path, rate, os.path.getmtime(path))
+
+def compute_in_background(key):
+    path, rate, modification_time = key
+    try: spectrogram = compute_spectrogram(path, rate)
+    except Exception as e:
+        with lock:
+            errors[key] = "Could not compute the spectrogram of {}: {}".format(os.path.basename(path), e)
+        return
+    with lock:
+        spectrograms[key] = spectrogram
@@ -0,0 +1,65 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import math
+import zlib
+import base64
+import numpy as np
+
+# Baked envelopes can be stored as compressed little endian buffers in a string
+# property, which is much smaller than a fcurve with one sampled point per frame.
+
+value_types = {
+    "FLOAT16" : np.dtype("<f2"),
+    "FLOAT32" : np.dtype("<f4") }
+
+def pack_values(values, value_type = "FLOAT32"):
+    data = np.asarray(values, dtype = value_types[value_type]).tobytes()
+    return base64.b64encode(zlib.compress(data)).decode("ascii")
+
+def unpack_values(text, value_type = "FLOAT32"):
+    if text == "": return np.zeros(0, dtype = np.float32)
+    data = zlib.decompress(base64.b64decode(text.encode("ascii")))
+    return np.frombuffer(data, dtype = value_types[value_type]).astype(np.float32)
+
+unpacked_values_cache = {}
+max_cache_size = 100
+
+# unpacking happens only once for every packed buffer
+def get_unpacked_values(text, value_type = "FLOAT32"):
+    key = (value_type, text)
+    values = unpacked_values_cache.get(key)
+    if values is None:
+        if len(unpacked_values_cache) >= max_cache_size:
+            unpacked_values_cache.clear()
+        values = unpack_values(text, value_type)
+        unpacked_values_cache[key] = values
+    return values
+
+# returns the first frame and one value per frame
+def values_per_frame(frames, values):
+    frames = np.asarray(frames, dtype = np.float64)
+    values = np.asarray(values, dtype = np.float64)
+    first_frame = int(math.floor(frames[0]))
+    last_frame = int(math.ceil(frames[-1]))
+    new_frames = np.arange(first_frame, last_frame + 1)
+    if len(frames) == len(new_frames) and np.all(frames == new_frames):
+        return first_frame, values.astype(np.float32)
+    return first_frame, np.interp(new_frames, frames, values).astype(np.float32)
@@ -0,0 +1,71 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import os
+import sys
+import json
+import pytest
+
+# The tests run with a normal Python interpreter:
+#     python -m pytest tests
+# The fake Blender modules are installed before the addon is imported.
+# Golden files are rewritten with --update-golden.
+
+tests_directory = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(tests_directory))
+sys.path.insert(0, tests_directory)
+
+import fake_bpy
+fake_bpy.install()
+
+golden_directory = os.path.join(tests_directory, "golden")
+
+def pytest_addoption(parser):
+    parser.addoption("--update-golden", action = "store_true", default = False,
+        help = "write the current results into the golden files")
+
+@pytest.fixture(scope = "session")
+def addon():
+    from audio_to_markers import addon
+    addon.register()
+    yield addon
+    addon.unregister()
+
+# every test gets a new scene
+@pytest.fixture
+def scene(addon):
+    fake_bpy.context.reset()
+    return fake_bpy.context.scene
+
+@pytest.fixture
+def golden(request):
+    update = request.config.getoption("--update-golden")
+    def check(name, result):
+        path = os.path.join(golden_directory, name + ".json")
+        if update or not os.path.exists(path):
+            os.makedirs(golden_directory, exist_ok = True)
+            with open(path, "w") as file:
+                json.dump(result, file, indent = 1)
+                file.write("\n")
+            if not update: pytest.skip("created golden file {}".format(name))
+        with open(path) as file:
+            expected = json.load(file)
+        return expected
+    return check
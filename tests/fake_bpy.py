@@ -0,0 +1,504 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import os
+import sys
+import math
+import types
+import struct
+import bisect
+
+# Small stand-ins for the Blender modules, so that the addon can be imported and its
+# helpers can run without Blender. Only the parts the addon uses are implemented:
+# properties become plain attributes that store floats with single precision and call
+# their update function, fcurves evaluate linearly between their points and drawing
+# functions do nothing. install() puts the modules into sys.modules.
+
+
+# Properties
+################################################
+
+property_defaults = {"String" : "", "Float" : 0.0, "Int" : 0, "Bool" : False}
+
+class Property:
+    def __init__(self, kind, **options):
+        self.kind = kind
+        self.options = options
+
+    def create_value(self, owner, name):
+        if self.kind == "Collection":
+            return Collection(self.options["type"], owner, name)
+        if self.kind == "Pointer":
+            value = self.options["type"]()
+            value._owner = owner
+            value._attribute = name
+            return value
+        if "default" in self.options: return self.options["default"]
+        if self.kind == "Enum": return self.options["items"][0][0]
+        return property_defaults[self.kind]
+
+    # Blender stores float properties with single precision
+    def convert(self, value):
+        if self.kind == "Float": return to_float32(value)
+        if self.kind == "FloatVector": return tuple(to_float32(element) for element in value)
+        if self.kind == "Int": return int(value)
+        return value
+
+def to_float32(value):
+    return struct.unpack("f", struct.pack("f", value))[0]
+
+def create_property_function(kind):
+    def property_function(**options):
+        return Property(kind, **options)
+    property_function.__name__ = kind + "Property"
+    return property_function
+
+props = types.ModuleType("bpy.props")
+for kind in ("String", "Float", "Int", "Bool", "Enum", "Collection", "Pointer", "FloatVector"):
+    setattr(props, kind + "Property", create_property_function(kind))
+props.__all__ = [name for name in dir(props) if name.endswith("Property")]
+
+class Struct:
+    def __init__(self):
+        for cls in reversed(type(self).__mro__):
+            for name, value in list(vars(cls).items()):
+                if isinstance(value, Property):
+                    object.__setattr__(self, name, value.convert(value.create_value(self, name)))
+
+    def __setattr__(self, name, value):
+        definition = getattr(type(self), name, None)
+        if not isinstance(definition, Property):
+            object.__setattr__(self, name, value)
+            return
+        object.__setattr__(self, name, definition.convert(value))
+        update = definition.options.get("update")
+        if update is not None: update(self, context)
+
+    def path_from_id(self):
+        collection = self.__dict__.get("_collection")
+        if collection is not None:
+            return "{}[{}]".format(collection.path, collection.index(self))
+        owner = self.__dict__.get("_owner")
+        if owner is None: return ""
+        owner_path = owner.path_from_id()
+        if owner_path == "": return self._attribute
+        return owner_path + "." + self._attribute
+
+class Collection(list):
+    def __init__(self, type, owner = None, attribute = ""):
+        super().__init__()
+        self.type = type
+        self.owner = owner
+        self.attribute = attribute
+
+    @property
+    def path(self):
+        owner_path = self.owner.path_from_id() if self.owner is not None else ""
+        if owner_path == "": return self.attribute
+        return owner_path + "." + self.attribute
+
+    def add(self):
+        item = self.type()
+        item._collection = self
+        self.append(item)
+        return item
+
+    def remove(self, index):
+        del self[index]
+
+    def clear(self):
+        del self[:]
+
+    def index(self, item):
+        for i, other in enumerate(self):
+            if other is item: return i
+        raise ValueError("item is not in the collection")
+
+    def get(self, name, default = None):
+        for item in self:
+            if item.name == name: return item
+        return default
+
+    def find(self, name):
+        for i, item in enumerate(self):
+            if item.name == name: return i
+        return -1
+
+
+# Types
+################################################
+
+class PropertyGroup(Struct):
+    name = ""
+
+    def keyframe_insert(self, data_path, frame = 0):
+        action = context.scene.animation_data.action
+        full_path = self.path_from_id() + "." + data_path
+        fcurve = action.fcurves.find(full_path)
+        if fcurve is None: fcurve = action.fcurves.new(full_path)
+        fcurve.keyframe_points.insert(frame, getattr(self, data_path))
+        return True
+
+class Operator(Struct):
+    def __init__(self):
+        super().__init__()
+        self.reports = []
+
+    def report(self, type, message):
+        self.reports.append((type, message))
+
+class Panel(Struct): pass
+
+class AddonPreferences(Struct): pass
+
+class Point:
+    def __init__(self, frame, value):
+        self.co = [frame, value]
+        self.interpolation = "BEZIER"
+        self.select_control_point = False
+
+class Points(list):
+    def foreach_set(self, attribute, values):
+        for i, point in enumerate(self):
+            point.co = [values[i * 2], values[i * 2 + 1]]
+
+    def foreach_get(self, attribute, values):
+        for i, point in enumerate(self):
+            values[i * 2], values[i * 2 + 1] = point.co
+
+class KeyframePoints(Points):
+    def insert(self, frame, value):
+        frames = [point.co[0] for point in self]
+        index = bisect.bisect_left(frames, frame)
+        if index < len(self) and self[index].co[0] == frame:
+            self[index].co[1] = value
+            return self[index]
+        point = Point(frame, value)
+        super().insert(index, point)
+        return point
+
+    def add(self, count = 1):
+        self.extend(Point(0.0, 0.0) for i in range(count))
+
+# keyframes always use linear interpolation, samples are interpolated linearly too
+class FCurve:
+    def __init__(self, data_path, index = 0):
+        self.data_path = data_path
+        self.array_index = index
+        self.keyframe_points = KeyframePoints()
+        self.sampled_points = Points()
+        self.select = False
+        self.hide = False
+        self.lock = False
+
+    def get_points(self):
+        return self.sampled_points if len(self.sampled_points) > 0 else self.keyframe_points
+
+    def evaluate(self, frame):
+        points = self.get_points()
+        if len(points) == 0: return 0.0
+        frames = [point.co[0] for point in points]
+        index = bisect.bisect_right(frames, frame)
+        if index == 0: return points[0].co[1]
+        if index == len(points): return points[-1].co[1]
+        (x1, y1), (x2, y2) = points[index - 1].co, points[index].co
+        return y1 + (y2 - y1) * (frame - x1) / (x2 - x1)
+
+    def range(self):
+        points = self.get_points()
+        if len(points) == 0: return (0.0, 0.0)
+        return (points[0].co[0], points[-1].co[0])
+
+    def convert_to_samples(self, start, end):
+        self.sampled_points = Points(Point(float(frame), self.evaluate(frame)) for frame in range(start, end + 1))
+        self.keyframe_points = KeyframePoints()
+
+    def update(self): pass
+
+class FCurves(list):
+    def new(self, data_path, index = 0, action_group = ""):
+        fcurve = FCurve(data_path, index)
+        self.append(fcurve)
+        return fcurve
+
+    def remove(self, fcurve):
+        for i, other in enumerate(self):
+            if other is fcurve:
+                del self[i]
+                return
+        raise ValueError("fcurve is not in the action")
+
+    def find(self, data_path, index = 0):
+        for fcurve in self:
+            if fcurve.data_path == data_path and fcurve.array_index == index: return fcurve
+        return None
+
+class Action:
+    def __init__(self, name = "Action"):
+        self.name = name
+        self.fcurves = FCurves()
+        data.actions.append(self)
+
+class AnimData:
+    def __init__(self):
+        self.action = Action()
+
+class TimelineMarker:
+    def __init__(self, name, frame):
+        self.name = name
+        self.frame = frame
+        self.select = False
+
+# iterates over a copy like the addon expects when it removes markers in a loop
+class TimelineMarkers(list):
+    def new(self, name, frame = 0):
+        marker = TimelineMarker(name, int(frame))
+        self.append(marker)
+        return marker
+
+    def remove(self, marker):
+        for i, other in enumerate(self):
+            if other is marker:
+                del self[i]
+                return
+        raise ValueError("marker is not in the scene")
+
+    def clear(self):
+        del self[:]
+
+    def __iter__(self):
+        return iter(list(super().__iter__()))
+
+class RenderSettings:
+    def __init__(self):
+        self.fps = 24
+        self.fps_base = 1.0
+
+class Scene(Struct):
+    def __init__(self, name = "Scene"):
+        super().__init__()
+        self.name = name
+        self.timeline_markers = TimelineMarkers()
+        self.render = RenderSettings()
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_current = 1
+        self.sync_mode = "NONE"
+        self.sequence_editor = None
+        self.animation_data = AnimData()
+
+    def path_from_id(self):
+        return ""
+
+class EnumItem:
+    def __init__(self, identifier, name):
+        self.identifier = identifier
+        self.name = name
+
+event_types = ([chr(i) for i in range(ord("A"), ord("Z") + 1)] +
+    ["SPACE", "ESC", "RET", "LEFTMOUSE", "RIGHTMOUSE", "MIDDLEMOUSE", "WHEELUPMOUSE",
+     "WHEELDOWNMOUSE", "MOUSEMOVE", "TIMER"])
+
+class Event:
+    bl_rna = types.SimpleNamespace(properties = {"type" : types.SimpleNamespace(
+        enum_items = [EnumItem(identifier, identifier.title()) for identifier in event_types])})
+
+    def __init__(self, type = "NONE", value = "NOTHING", shift = False, ctrl = False, alt = False,
+            mouse_region_x = 0, mouse_region_y = 0):
+        self.type = type
+        self.value = value
+        self.shift = shift
+        self.ctrl = ctrl
+        self.alt = alt
+        self.mouse_region_x = mouse_region_x
+        self.mouse_region_y = mouse_region_y
+
+class SpaceGraphEditor:
+    @staticmethod
+    def draw_handler_add(*args): return object()
+
+    @staticmethod
+    def draw_handler_remove(*args): pass
+
+bpy_types = types.ModuleType("bpy.types")
+for cls in (PropertyGroup, Operator, Panel, AddonPreferences, Scene, Event, SpaceGraphEditor):
+    setattr(bpy_types, cls.__name__, cls)
+
+
+# Context and Data
+################################################
+
+class Area:
+    def __init__(self):
+        self.width = 1000
+        self.height = 600
+        self.redraw_amount = 0
+
+    def tag_redraw(self):
+        self.redraw_amount += 1
+
+class WindowManager:
+    def __init__(self):
+        self.timers = []
+        self.modal_handlers = []
+
+    def event_timer_add(self, time_step, window = None):
+        timer = types.SimpleNamespace(time_step = time_step)
+        self.timers.append(timer)
+        return timer
+
+    def event_timer_remove(self, timer):
+        self.timers.remove(timer)
+
+    def modal_handler_add(self, operator):
+        self.modal_handlers.append(operator)
+
+    def fileselect_add(self, operator):
+        self.modal_handlers.append(operator)
+
+class Preferences:
+    def __init__(self):
+        self.addons = {}
+
+class Context:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        data.actions.clear()
+        self.scene = Scene()
+        data.scenes[:] = [self.scene]
+        self.selected_objects = []
+        self.active_object = None
+        self.area = Area()
+        self.region = Area()
+        self.space_data = types.SimpleNamespace(cursor_position_y = 0.0)
+        self.screen = types.SimpleNamespace(is_animation_playing = False)
+        self.window = None
+        self.window_manager = WindowManager()
+        self.preferences = Preferences()
+
+data = types.SimpleNamespace(actions = [], scenes = [], filepath = "")
+context = Context()
+
+def abspath(path):
+    if path.startswith("//"):
+        directory = os.path.dirname(data.filepath) if data.filepath != "" else os.getcwd()
+        return os.path.join(directory, path[2:])
+    return path
+
+class OperatorRecorder:
+    def __init__(self, path = "bpy.ops"):
+        self.path = path
+        self.calls = []
+
+    def __getattr__(self, name):
+        recorder = OperatorRecorder(self.path + "." + name)
+        recorder.calls = self.calls
+        setattr(self, name, recorder)
+        return recorder
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((self.path, args, kwargs))
+        return {"FINISHED"}
+
+def persistent(function):
+    return function
+
+handlers = types.ModuleType("bpy.app.handlers")
+handlers.persistent = persistent
+for name in ("load_pre", "load_post", "save_pre", "save_post", "undo_pre", "undo_post", "redo_pre", "redo_post", "frame_change_pre", "frame_change_post"):
+    setattr(handlers, name, [])
+
+app = types.ModuleType("bpy.app")
+app.handlers = handlers
+app.driver_namespace = {}
+app.version = (2, 79, 0)
+
+path = types.ModuleType("bpy.path")
+path.abspath = abspath
+path.basename = os.path.basename
+
+utils = types.ModuleType("bpy.utils")
+utils.register_class = lambda cls: None
+utils.unregister_class = lambda cls: None
+
+bpy = types.ModuleType("bpy")
+bpy.types = bpy_types
+bpy.props = props
+bpy.app = app
+bpy.path = path
+bpy.utils = utils
+bpy.ops = OperatorRecorder()
+bpy.data = data
+bpy.context = context
+
+
+# Drawing and Math
+################################################
+
+class NoOperationModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"): raise AttributeError(name)
+        if name.startswith("GL_"): return 0
+        return lambda *args, **kwargs: None
+
+class Vector:
+    def __init__(self, values):
+        self.values = [float(value) for value in values]
+
+    x = property(lambda self: self.values[0])
+    y = property(lambda self: self.values[1])
+
+    @property
+    def length(self):
+        return math.sqrt(sum(value * value for value in self.values))
+
+    def __sub__(self, other):
+        return Vector([a - b for a, b in zip(self.values, other)])
+
+    def __add__(self, other):
+        return Vector([a + b for a, b in zip(self.values, other)])
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+mathutils = types.ModuleType("mathutils")
+mathutils.Vector = Vector
+
+def install():
+    modules = {
+        "bpy" : bpy,
+        "bpy.types" : bpy_types,
+        "bpy.props" : props,
+        "bpy.app" : app,
+        "bpy.app.handlers" : handlers,
+        "bpy.path" : path,
+        "bpy.utils" : utils,
+        "bgl" : NoOperationModule("bgl"),
+        "blf" : NoOperationModule("blf"),
+        "mathutils" : mathutils }
+    sys.modules.update(modules)
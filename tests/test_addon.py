@@ -0,0 +1,466 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+import os
+import time
+import numpy as np
+import fake_bpy
+
+def create_bake_fcurve(addon, values, start_frame = 1, low = 80, high = 250):
+    fcurve = addon.create_item_and_fcurve("//music.wav", low, high)
+    fcurve.keyframe_points.clear()
+    for i, value in enumerate(values):
+        fcurve.keyframe_points.insert(start_frame + i, float(value))
+    fcurve.convert_to_samples(start_frame, start_frame + len(values) - 1)
+    return fcurve
+
+def create_test_values(amount = 300):
+    random = np.random.RandomState(5)
+    return np.round(np.abs(np.sin(np.arange(amount) * 0.37)) * random.uniform(0.5, 1, amount), 3)
+
+# the first version of get_high_frames
+def get_high_frames_reference(sound_curve, start, end, threshold):
+    def highest_value_of_frame(frame):
+        return max(sound_curve.evaluate(frame - 0.5), sound_curve.evaluate(frame - 0.25), sound_curve.evaluate(frame), sound_curve.evaluate(frame + 0.25))
+    start, end = sorted([start, end])
+    frames = []
+    is_over_threshold = False
+    for frame in range(round(start), round(end)):
+        value = highest_value_of_frame(frame)
+        next_value = highest_value_of_frame(frame + 1)
+        if value > next_value > threshold and not is_over_threshold:
+            is_over_threshold = True
+            frames.append(frame)
+        if value < threshold:
+            is_over_threshold = False
+    return frames
+
+
+# FCurves
+################################################
+
+def test_active_fcurves(addon, scene):
+    fcurve = create_bake_fcurve(addon, [0, 1, 0])
+    assert addon.get_active_fcurves() == []
+    fcurve.select = True
+    assert addon.get_active_fcurves() == [fcurve]
+    assert addon.get_active_fcurves(return_owner = True) == [(scene, fcurve)]
+    assert addon.get_bake_data_index_from_fcurve(fcurve) == 0
+
+def test_band_set_items_are_found_again(addon, scene):
+    bands = addon.create_band_set("LOGARITHMIC", 8, 20, 20000)
+    for i in range(2):
+        for low, high in bands:
+            addon.create_empty_bake_fcurve("//music.wav", low, high)
+    assert len(scene.audio_to_markers.bake_data) == len(bands)
+
+def test_high_frames_match_reference(addon, scene):
+    fcurve = create_bake_fcurve(addon, create_test_values())
+    for start, end, threshold in ((1, 300, 0.5), (40.3, 120.7, 0.2), (250, 10, 0.8)):
+        assert addon.get_high_frames(fcurve, start, end, threshold) == get_high_frames_reference(fcurve, start, end, threshold)
+
+def write_hits(path, frequence, length, decay, onsets = (0.5, 1.3, 2.1)):
+    import wave
+    sample_rate = 8000
+    time = np.arange(sample_rate * 3) / sample_rate
+    samples = np.zeros(len(time))
+    for onset in onsets:
+        inside = (time >= onset) & (time < onset + length)
+        samples[inside] = 0.8 * np.sin(2 * np.pi * frequence * time[inside]) * np.exp(-(time[inside] - onset) * decay)
+    with wave.open(str(path), "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(sample_rate)
+        file.writeframes((samples * 2 ** 15).astype("<i2").tobytes())
+    return str(path)
+
+def test_precise_high_frames_depend_on_the_bake_method(addon, scene, tmp_path):
+    path = write_hits(tmp_path / "clicks.wav", 150, 0.3, 20)
+    fcurve = create_bake_fcurve(addon, create_test_values(72), low = 80, high = 250)
+    item = scene.audio_to_markers.bake_data[0]
+    item.path = path
+    item.bake_method = "FILTER"
+    frames = addon.get_precise_high_frames(fcurve, 1, 72, 0.1)
+    assert np.allclose(frames, [1 + onset * 24 for onset in (0.5, 1.3, 2.1)], atol = 0.5)
+    # values from a spectrum or from Blender do not match the envelope of the filter
+    for bake_method in ("SPECTRUM", "SOUND_BAKE"):
+        item.bake_method = bake_method
+        assert addon.get_precise_high_frames(fcurve, 1, 72, 0.1) == addon.get_high_frames(fcurve, 1, 72, 0.1)
+
+def test_bake_sound_of_blender_sets_the_bake_method(addon, scene):
+    fcurve = create_bake_fcurve(addon, create_test_values(72))
+    item = scene.audio_to_markers.bake_data[0]
+    item.bake_method = "FILTER"
+    scene.audio_to_markers.path = item.path
+    assert addon.BakeSound().execute(fake_bpy.context) == {"FINISHED"}
+    assert fake_bpy.bpy.ops.calls[-1][0] == "bpy.ops.graph.sound_bake"
+    assert item.bake_method == "SOUND_BAKE"
+
+# the envelope with onset_rate values per second follows the periods of low frequences
+def test_precise_high_frames_of_low_bands(addon, scene, tmp_path):
+    from audio_to_markers import core, decoding
+    for (low, high), frequence in (((20, 40), 30), ((40, 80), 50), ((40, 80), 70)):
+        path = write_hits(tmp_path / "{}.wav".format(frequence), frequence, 0.4, 5)
+        samples, sample_rate = decoding.read_samples(path)
+        values = core.extract_envelope(samples, sample_rate, low, high, 24)
+        fcurve = create_bake_fcurve(addon, values, low = low, high = high)
+        item = scene.audio_to_markers.bake_data[addon.get_bake_data_index_from_fcurve(fcurve)]
+        item.path = path
+        item.bake_method = "FILTER"
+        frames = addon.get_precise_high_frames(fcurve, 1, len(values), 0.45)
+        assert np.allclose(frames, [1 + onset * 24 for onset in (0.5, 1.3, 2.1)], atol = 1)
+    assert frames != addon.get_high_frames(fcurve, 1, len(values), 0.45)
+    # a period of 20 Hz is longer than a frame, so the per frame values are used
+    fcurve = addon.get_fcurve_from_bake_data_index(0)
+    assert addon.get_precise_high_frames(fcurve, 1, 72, 0.45) == addon.get_high_frames(fcurve, 1, 72, 0.45)
+
+def test_high_frames_of_packed_values(addon, scene, golden):
+    fcurve = create_bake_fcurve(addon, create_test_values())
+    expected = addon.get_high_frames(fcurve, 1, 300, 0.5)
+    item = scene.audio_to_markers.bake_data[0]
+    addon.pack_bake_fcurve(item, fcurve, "FLOAT32")
+    assert addon.get_high_frames(fcurve, 1, 300, 0.5) == expected
+    assert expected == golden("addon_high_frames", expected)
+
+def test_unbake_fcurve(addon, scene, golden):
+    values = [0, 0, 0.5, 0.5, 1, 1, 1, 0.25, 0]
+    fcurve = create_bake_fcurve(addon, values)
+    fcurve.select = True
+    operator = addon.UnbakeFCurve()
+    assert operator.execute(fake_bpy.context) == {"FINISHED"}
+    unbaked = scene.animation_data.action.fcurves[0]
+    assert len(unbaked.sampled_points) == 0
+    locations = [list(point.co) for point in unbaked.keyframe_points]
+    assert locations == golden("unbaked_keyframes", locations)
+
+
+# Storage
+################################################
+
+def test_bake_storage_update(addon, scene):
+    values = create_test_values(100)
+    create_bake_fcurve(addon, values)
+    create_bake_fcurve(addon, values[::-1], low = 250, high = 600)
+    settings = scene.audio_to_markers
+    settings.path = "//music.wav"
+    settings.bake_storage = "FLOAT32"
+    assert all(item.packed_values != "" for item in settings.bake_data)
+    # only the fcurve of the current frequence range is kept
+    assert addon.get_fcurve_from_bake_data_index(0) is not None
+    assert addon.get_fcurve_from_bake_data_index(1) is None
+    first_frame, unpacked = addon.get_stored_values(settings.bake_data[1])
+    assert first_frame == 1
+    assert np.allclose(unpacked, values[::-1], atol = 1e-6)
+
+def test_bake_storage_keeps_edited_keyframes(addon, scene):
+    fcurve = create_bake_fcurve(addon, create_test_values(9))
+    settings = scene.audio_to_markers
+    settings.path = "//music.wav"
+    fcurve.select = True
+    assert addon.UnbakeFCurve().execute(fake_bpy.context) == {"FINISHED"}
+    fcurve = addon.get_fcurve_from_bake_data_index(0)
+    fcurve.keyframe_points.insert(10, 0.5)
+    keyframes = [tuple(point.co) for point in fcurve.keyframe_points]
+    settings.bake_storage = "FLOAT32"
+    settings.low_frequence = 250
+    settings.low_frequence = 80
+    fcurve = addon.get_fcurve_from_bake_data_index(0)
+    assert len(fcurve.sampled_points) == 0
+    assert [tuple(point.co) for point in fcurve.keyframe_points] == keyframes
+
+def test_cache_files_are_used_after_saving(addon, scene, tmp_path, monkeypatch):
+    values = create_test_values(100)
+    create_bake_fcurve(addon, values)
+    settings = scene.audio_to_markers
+    item = settings.bake_data[0]
+    settings.bake_storage = "CACHE"
+    assert item.packed_values != "" and item.sidecar_path == ""
+    monkeypatch.setattr(fake_bpy.data, "filepath", str(tmp_path / "scene.blend"))
+    addon.update_bake_storage()
+    assert item.packed_values == "" and item.is_cached
+    assert os.path.isfile(str(tmp_path / "audio_to_markers_cache" / "scene" / item.sidecar_path))
+    assert np.allclose(addon.get_stored_values(item)[1], values, atol = 1e-6)
+
+def create_cached_item(addon, scene, values):
+    create_bake_fcurve(addon, values)
+    scene.audio_to_markers.bake_storage = "CACHE"
+    return scene.audio_to_markers.bake_data[0]
+
+def test_remove_unused_cache_files_of_one_blend_file(addon, scene, tmp_path, monkeypatch):
+    monkeypatch.setattr(fake_bpy.data, "filepath", str(tmp_path / "first.blend"))
+    first_path = addon.get_sidecar_abspath(create_cached_item(addon, scene, create_test_values(100)))
+    fake_bpy.context.reset()
+    monkeypatch.setattr(fake_bpy.data, "filepath", str(tmp_path / "second.blend"))
+    item = create_cached_item(addon, fake_bpy.context.scene, create_test_values(50))
+    second_path = addon.get_sidecar_abspath(item)
+    item.sidecar_path = ""
+    item.is_cached = False
+    assert addon.RemoveUnusedCacheFiles().execute(fake_bpy.context) == {"FINISHED"}
+    assert not os.path.exists(second_path)
+    assert os.path.isfile(first_path)
+
+def test_cache_files_are_copied_when_saving_into_another_folder(addon, scene, tmp_path, monkeypatch):
+    values = create_test_values(100)
+    monkeypatch.setattr(fake_bpy.data, "filepath", str(tmp_path / "scene.blend"))
+    item = create_cached_item(addon, scene, values)
+    for handler in fake_bpy.handlers.save_pre: handler(None)
+    monkeypatch.setattr(fake_bpy.data, "filepath", str(tmp_path / "other" / "copy.blend"))
+    for handler in fake_bpy.handlers.save_post: handler(None)
+    assert os.path.isfile(str(tmp_path / "other" / "audio_to_markers_cache" / "copy" / item.sidecar_path))
+    assert np.allclose(addon.get_stored_values(item)[1], values, atol = 1e-6)
+
+def test_export_sidecar_without_values(addon, scene, tmp_path):
+    addon.new_bake_item("//music.wav", 80, 250)
+    scene.audio_to_markers.path = "//music.wav"
+    operator = addon.ExportSidecar()
+    operator.filepath = str(tmp_path / "envelopes.atmenv")
+    assert operator.execute(fake_bpy.context) == {"CANCELLED"}
+    assert operator.reports[0][0] == {"ERROR"}
+    assert not os.path.exists(operator.filepath)
+
+def test_processing_changed(addon, scene):
+    from audio_to_markers import core
+    values = create_test_values(100)
+    create_bake_fcurve(addon, values)
+    item = scene.audio_to_markers.bake_data[0]
+    item.attack = 3
+    item.use_processing = True
+    expected = core.process_envelope(values.astype(np.float32), 0, 3, 0, 0, 1, 1, False)
+    fcurve = addon.get_fcurve_from_bake_data_index(0)
+    result = [fcurve.evaluate(1 + i) for i in range(len(values))]
+    assert np.allclose(result, expected, atol = 1e-6)
+    # the original values are kept
+    assert np.allclose(addon.get_stored_values(item)[1], values, atol = 1e-6)
+
+def test_processed_values_cache(addon, scene):
+    fcurve = create_bake_fcurve(addon, create_test_values(100))
+    item = scene.audio_to_markers.bake_data[0]
+    addon.pack_bake_fcurve(item, fcurve, "FLOAT32")
+    addon.processed_values_cache.clear()
+    item.use_processing = True
+    first = addon.get_processed_values(item)[1]
+    assert addon.get_processed_values(item)[1] is first
+    for smoothing in (1, 2, 3):
+        item.smoothing = smoothing
+        assert addon.get_processed_values(item)[1] is not first
+    # there is one entry per item
+    assert len(addon.processed_values_cache) == 1
+
+
+def test_bake_data_is_locked_while_baking(addon, scene):
+    fcurve = create_bake_fcurve(addon, create_test_values(100))
+    addon.running_background_bakes.append(None)
+    try:
+        assert not addon.RemoveBakeData.poll(fake_bpy.context)
+        assert not addon.BakeSoundInBackground.poll(fake_bpy.context)
+        scene.audio_to_markers.bake_data[0].use_processing = True
+        assert addon.get_fcurve_from_bake_data_index(0) is fcurve
+    finally:
+        addon.running_background_bakes.remove(None)
+    assert addon.RemoveBakeData.poll(fake_bpy.context)
+
+def test_background_bake_stops_before_undo(addon, scene, tmp_path):
+    scene.audio_to_markers.path = write_hits(tmp_path / "music.wav", 150, 0.3, 20)
+    window_manager = fake_bpy.context.window_manager
+    operator = addon.BakeSoundInBackground()
+    assert operator.invoke(fake_bpy.context, fake_bpy.Event()) == {"RUNNING_MODAL"}
+    assert addon.is_background_bake_running()
+    for handler in fake_bpy.handlers.undo_pre:
+        handler(None)
+    assert not addon.is_background_bake_running()
+    assert window_manager.timers == []
+    assert operator.modal(fake_bpy.context, fake_bpy.Event("TIMER")) == {"CANCELLED"}
+    # Blender cancels the modal operator again when it loads a file
+    operator.cancel(fake_bpy.context)
+    assert not addon.is_background_bake_running()
+
+def test_cancelled_background_bake_keeps_the_old_values(addon, scene, tmp_path, monkeypatch):
+    monkeypatch.setattr(fake_bpy.data, "filepath", str(tmp_path / "scene.blend"))
+    write_hits(tmp_path / "music.wav", 150, 0.3, 20)
+    values = create_test_values(9)
+    create_bake_fcurve(addon, values)
+    settings = scene.audio_to_markers
+    settings.path = "//music.wav"
+    settings.low_frequence, settings.high_frequence = 80, 250
+    item = settings.bake_data[0]
+    item.bake_method = "SOUND_BAKE"
+    for event_type, expected in (("ESC", {"CANCELLED"}), ("TIMER", {"FINISHED"})):
+        operator = addon.BakeSoundInBackground()
+        assert operator.invoke(fake_bpy.context, fake_bpy.Event()) == {"RUNNING_MODAL"}
+        operator.job.thread.join()
+        assert operator.modal(fake_bpy.context, fake_bpy.Event(event_type)) == expected
+        first_frame, baked_values = addon.get_fcurve_values_per_frame(addon.get_fcurve_from_current_settings())
+        if event_type == "ESC":
+            assert first_frame == 1 and np.allclose(baked_values, values)
+            assert item.bake_method == "SOUND_BAKE"
+    # the finished bake replaces the old values
+    assert len(baked_values) == 72
+    assert item.bake_method == "FILTER"
+
+
+# Drivers
+################################################
+
+def test_driver_bands_of_several_scenes(addon, scene):
+    from audio_to_markers import drivers
+    create_bake_fcurve(addon, [0.25] * 10)
+    other_scene = fake_bpy.Scene("Other")
+    fake_bpy.context.scene = other_scene
+    create_bake_fcurve(addon, [0.75] * 10)
+    drivers.clear_loaded_bands()
+    assert drivers.band_value(0, 5) == 0.75
+    fake_bpy.context.scene = scene
+    assert drivers.band_value(0, 5) == 0.25
+
+
+# Markers
+################################################
+
+def test_insert_and_remove_markers(addon, scene):
+    addon.insert_markers([5, 10, 20])
+    addon.insert_markers([10, 15])
+    assert sorted(addon.get_marked_frames()) == [5, 10, 15, 20]
+    addon.remove_markers(12, 4)
+    assert sorted(addon.get_marked_frames()) == [15, 20]
+
+def test_precise_markers(addon, scene):
+    addon.insert_precise_markers([10.4, 10.6, 12.2])
+    assert sorted(addon.get_marked_frames()) == [10, 11, 12]
+    times = dict(addon.get_marker_times(scene, 1))
+    assert abs(times["#11"] - 9.6 / 24) < 1e-6
+    addon.insert_markers([30])
+    assert dict(addon.get_marker_times(scene, 1))["#30"] == 29 / 24
+    addon.remove_markers(11, 12)
+    assert [item.name for item in scene.audio_to_markers.marker_times] == ["#10"]
+
+def test_marker_times_of_markers_with_the_same_name(addon, scene, tmp_path):
+    path = tmp_path / "beats.csv"
+    path.write_text("kick,0.1\nkick,0.583333\nkick,0.6\n")
+    operator = addon.ImportMarkers()
+    operator.filepath = str(path)
+    operator.start_frame = 1
+    operator.tolerance = 0.1
+    assert operator.execute(fake_bpy.context) == {"FINISHED"}
+    # the last two markers are on the same frame
+    assert [(marker.name, marker.frame) for marker in scene.timeline_markers] == [("kick", 3), ("kick", 15), ("kick.001", 15)]
+    addon.remove_markers(3, 3)
+    times = addon.get_marker_times(scene, 1)
+    assert [name for name, time in times] == ["kick", "kick.001"]
+    assert np.allclose([time for name, time in times], [0.583333, 0.6], atol = 1e-5)
+
+def test_exported_markers_are_imported_again(addon, scene, tmp_path):
+    path = tmp_path / "markers.csv"
+    addon.insert_precise_markers([10.4, 25.25, 40.75])
+    operator = addon.ExportMarkers()
+    operator.filepath = str(path)
+    operator.start_frame = 5
+    assert operator.execute(fake_bpy.context) == {"FINISHED"}
+    exported = path.read_text()
+
+    fake_bpy.context.reset()
+    operator = addon.ImportMarkers()
+    operator.filepath = str(path)
+    operator.start_frame = 5
+    assert operator.execute(fake_bpy.context) == {"FINISHED"}
+    operator = addon.ExportMarkers()
+    operator.filepath = str(path)
+    operator.start_frame = 5
+    assert operator.execute(fake_bpy.context) == {"FINISHED"}
+    assert path.read_text() == exported
+
+def test_import_markers_of_the_current_sound(addon, scene, tmp_path):
+    path = tmp_path / "rekordbox.xml"
+    path.write_text('<?xml version="1.0"?><DJ_PLAYLISTS><COLLECTION>'
+        '<TRACK Name="Intro" Location="file://localhost/Music/intro.mp3"><POSITION_MARK Name="Start" Start="1"/></TRACK>'
+        '<TRACK Name="Main" Location="file://localhost/Music/music.mp3"><POSITION_MARK Name="Drop" Start="2"/></TRACK>'
+        '</COLLECTION></DJ_PLAYLISTS>')
+    scene.audio_to_markers.path = "//music.wav"
+    operator = addon.ImportMarkers()
+    operator.invoke(fake_bpy.context, fake_bpy.Event())
+    assert operator.track == "music.wav"
+    operator.filepath = str(path)
+    assert operator.execute(fake_bpy.context) == {"FINISHED"}
+    assert [marker.name for marker in scene.timeline_markers] == ["Drop"]
+
+def test_import_markers_operator(addon, scene, tmp_path):
+    path = tmp_path / "beats.csv"
+    path.write_text("time\n" + "".join("{:.6f}\n".format(i * 0.25) for i in range(20000)))
+    addon.insert_markers([1])
+    operator = addon.ImportMarkers()
+    operator.filepath = str(path)
+    operator.start_frame = 1
+    start = time.perf_counter()
+    assert operator.execute(fake_bpy.context) == {"FINISHED"}
+    assert time.perf_counter() - start < 1
+    # the first beat is on the existing marker
+    assert len(scene.timeline_markers) == 20000
+    assert len(scene.audio_to_markers.marker_times) == 19999
+    assert scene.timeline_markers[-1].frame == 1 + 19999 * 6
+
+
+# Events
+################################################
+
+def test_event_table_matches_linear_search(addon):
+    manager = addon.EventManager()
+    for action, event_type, event_value, shift, ctrl, alt in addon.default_key_bindings:
+        manager.add_event(action, addon.EventSettings(event_type, event_value, shift, ctrl, alt))
+    manager.add_event("ANY_A", addon.EventSettings("A", "ANY"))
+    for event_type in ("A", "P", "SPACE", "MIDDLEMOUSE", "ESC", "Q"):
+        for event_value in ("PRESS", "RELEASE"):
+            for shift, ctrl, alt in ((False, False, False), (True, False, False), (False, True, False), (False, False, True)):
+                event = fake_bpy.Event(event_type, event_value, shift, ctrl, alt)
+                names = manager.get_names(event)
+                assert manager.get_name(event) == (names[0] if len(names) > 0 else None)
+
+def test_key_binding_help(addon):
+    lines = addon.get_key_binding_help(addon.default_key_bindings)
+    assert "Space: Play from cursor/Pause" in lines
+    assert "Esc: Finish operator" in lines
+
+
+# Profiling
+################################################
+
+def test_profiling_follows_the_loaded_file(addon, scene):
+    from audio_to_markers.profiling import profiler
+    scene.audio_to_markers.enable_profiling = True
+    assert profiler.enabled
+    # a loaded file does not call the update function
+    fake_bpy.context.reset()
+    for handler in fake_bpy.handlers.load_post: handler(None)
+    assert not profiler.enabled
+
+def test_profile_while_threads_add_spans():
+    import threading
+    from audio_to_markers.profiling import Profiler
+    profiler = Profiler()
+    profiler.enabled = True
+    def add_spans():
+        for i in range(20000):
+            with profiler.span("Thread"): pass
+    thread = threading.Thread(target = add_spans)
+    thread.start()
+    while thread.is_alive():
+        profiler.get_summary()
+        profiler.to_chrome_trace()
+    thread.join()
+    assert profiler.get_summary()[0][1] == 10000
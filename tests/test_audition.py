@@ -0,0 +1,51 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+from audio_to_markers import audition
+
+class FakeTimer:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+def test_clock_follows_null_device():
+    timer = FakeTimer()
+    device = audition.NullDevice(duration = 10, buffer_duration = 0.02, timer = timer)
+    device.play("music.wav", 1.0)
+    for i in range(100):
+        timer.time = i * 0.007
+        # the time is never more than one poll interval behind the real time
+        assert -0.007 <= device.get_time() - (1.0 + timer.time) <= 1e-9
+    assert abs(device.latency - 0.02) < 1e-9
+    assert device.is_playing
+    timer.time = 9.5
+    assert not device.is_playing
+
+def test_extra_latency_is_subtracted():
+    timer = FakeTimer()
+    device = audition.NullDevice(extra_latency = 0.05, timer = timer)
+    device.play("music.wav", 2.0)
+    timer.time = 0.5
+    assert abs(device.get_time() - 2.45) < 1e-9
+    device.stop()
+    assert not device.is_playing
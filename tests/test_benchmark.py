@@ -0,0 +1,30 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+from audio_to_markers import benchmark
+
+# the addon needs bpy, the benchmark imports it with the fake modules
+def test_addon_import_is_measured():
+    result = benchmark.measure_import("audio_to_markers.addon")
+    assert result is not None
+    duration, numpy_imported, uses_fake_bpy = result
+    assert uses_fake_bpy
+    assert not numpy_imported
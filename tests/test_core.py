@@ -0,0 +1,118 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+import time
+import numpy as np
+from audio_to_markers import core
+
+# Envelopes are compared with a small tolerance because the fourier transforms
+# may differ in the last bits between numpy builds, frame indices must be equal.
+
+sample_rate = 8000
+
+def create_test_signal(seconds = 4):
+    random = np.random.RandomState(1)
+    times = np.arange(sample_rate * seconds) / sample_rate
+    samples = 0.05 * random.uniform(-1, 1, len(times))
+    for onset in (0.31, 0.95, 1.5, 2.02, 2.77, 3.4):
+        after = np.maximum(times - onset, 0)
+        samples += np.where(times >= onset, np.sin(2 * np.pi * 120 * after) * np.exp(-after / 0.05), 0)
+        samples += np.where(times >= onset, 0.5 * np.sin(2 * np.pi * 2000 * after) * np.exp(-after / 0.02), 0)
+    return samples.astype(np.float32)
+
+# the loop of the first version of get_high_frames on already sampled values
+def find_high_frames_reference(values, threshold):
+    frames = []
+    is_over_threshold = False
+    for frame in range(len(values) - 1):
+        value, next_value = values[frame], values[frame + 1]
+        if value > next_value > threshold and not is_over_threshold:
+            is_over_threshold = True
+            frames.append(frame)
+        if value < threshold:
+            is_over_threshold = False
+    return frames
+
+def test_find_high_frames_matches_reference():
+    random = np.random.RandomState(0)
+    for i in range(500):
+        values = np.round(random.uniform(0, 1, random.randint(0, 60)), 1)
+        threshold = random.choice([0.0, 0.3, 0.5, 0.9])
+        assert core.find_high_frames(values, threshold).tolist() == find_high_frames_reference(values.tolist(), threshold)
+
+def test_extract_envelope(golden):
+    envelope = core.extract_envelope(create_test_signal(), sample_rate, 80, 250, 24)
+    expected = golden("extract_envelope", envelope.tolist())
+    np.testing.assert_allclose(envelope, expected, rtol = 1e-4, atol = 1e-6)
+
+def test_spectrum_bands(golden):
+    chunks = list(core.iter_spectrum_band_chunks(create_test_signal(), sample_rate, [(80, 250), (1000, 3000)], 24))
+    bands = np.concatenate([np.stack(envelopes) for first_frame, envelopes in chunks], axis = 1)
+    expected = golden("spectrum_bands", bands.tolist())
+    np.testing.assert_allclose(bands, expected, rtol = 1e-4, atol = 1e-6)
+
+def test_high_frames_of_envelope(golden):
+    envelope = core.extract_envelope(create_test_signal(), sample_rate, 80, 250, 24)
+    frames = core.find_high_frames(envelope, 0.3).tolist()
+    assert frames == golden("high_frames", frames)
+
+def test_precise_peaks(golden):
+    envelope = core.extract_envelope(create_test_signal(), sample_rate, 80, 250, 240)
+    peaks = core.find_precise_peaks(envelope, 0.3)
+    expected = golden("precise_peaks", peaks.tolist())
+    np.testing.assert_allclose(peaks, expected, atol = 1e-3)
+    assert np.all(np.abs(peaks / 240 - np.array([0.31, 0.95, 1.5, 2.02, 2.77, 3.4])) < 0.01)
+
+def test_precise_peaks_of_a_low_frequence():
+    # the envelope of two hits at 50 Hz still has a peak in every half period
+    times = np.arange(480) / 240
+    envelope = np.abs(np.sin(2 * np.pi * 50 * times)) * np.where(times < 1, np.exp(-times * 4), np.exp(-(times - 1) * 4))
+    assert len(core.find_precise_peaks(envelope, 0.3)) > 2
+    peaks = core.find_precise_peaks(envelope, 0.3, width = 5)
+    assert np.allclose(peaks / 240, [0, 1], atol = 0.01)
+
+def test_process_envelope(golden):
+    values = np.abs(np.sin(np.arange(200) * 0.1)).astype(np.float32)
+    processed = core.process_envelope(values, smoothing = 3, attack = 1, release = 5, gate = 0.1,
+        compression_threshold = 0.5, compression_ratio = 2, normalize = True)
+    expected = golden("process_envelope", processed.tolist())
+    np.testing.assert_allclose(processed, expected, rtol = 1e-6)
+
+def test_simplify():
+    frames, values = core.simplify(np.arange(8), np.array([0, 0, 1, 1, 1, 2, 2, 0]))
+    assert frames.tolist() == [2, 5, 7]
+    assert values.tolist() == [1, 2, 0]
+
+def best_time(function, *args, repetitions = 3):
+    durations = []
+    for i in range(repetitions):
+        start = time.perf_counter()
+        function(*args)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+def test_find_high_frames_time():
+    values = np.abs(np.sin(np.arange(1000000) * 0.01))
+    assert best_time(core.find_high_frames, values, 0.5) < 0.25
+
+def test_extract_envelope_time():
+    samples = np.random.RandomState(0).uniform(-1, 1, 44100 * 60).astype(np.float32)
+    assert best_time(core.extract_envelope, samples, 44100, 80, 250, 24, repetitions = 1) < 3
@@ -0,0 +1,131 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+import gzip
+import time
+import pytest
+import numpy as np
+from audio_to_markers import markers
+
+example_markers = [("#13", 0.5123456), ('kick, "loud"', 61.25), ("#200", 3661.0)]
+
+def test_export_formats(golden):
+    texts = {
+        "csv" : markers.markers_to_csv(example_markers),
+        "json" : markers.markers_to_json(example_markers),
+        "edl" : markers.markers_to_edl(example_markers, 24) }
+    assert texts == golden("marker_export", texts)
+
+def test_csv_round_trip(tmp_path):
+    path = str(tmp_path / "markers.csv")
+    markers.write_markers(path, example_markers, 24)
+    imported = list(markers.iter_marker_times(path))
+    assert [name for name, time in imported] == [name for name, time in example_markers]
+    np.testing.assert_allclose([time for name, time in imported], [time for name, time in example_markers], atol = 1e-6)
+
+def test_json_round_trip(tmp_path):
+    path = str(tmp_path / "markers.json")
+    markers.write_markers(path, example_markers, 24)
+    assert [name for name, time in markers.iter_marker_times(path)] == [name for name, time in example_markers]
+
+def test_text_formats(tmp_path):
+    path = tmp_path / "labels.txt"
+    path.write_text("1.5\t1.5\tkick\n3.25\t3.5\tsnare\n")
+    assert list(markers.iter_marker_times(str(path))) == [("kick", 1.5), ("snare", 3.25)]
+    path = tmp_path / "times.csv"
+    path.write_text("time\n0.5\n1.0\n")
+    assert list(markers.iter_marker_times(str(path))) == [("", 0.5), ("", 1.0)]
+
+def test_rekordbox_beat_grid(tmp_path):
+    path = tmp_path / "rekordbox.xml"
+    path.write_text('<?xml version="1.0"?><DJ_PLAYLISTS><COLLECTION>'
+        '<TRACK TrackID="1" TotalTime="3"><TEMPO Inizio="0.1" Bpm="120"/><TEMPO Inizio="1.1" Bpm="60"/>'
+        '<POSITION_MARK Name="Drop" Type="0" Start="2.0" Num="0"/></TRACK></COLLECTION></DJ_PLAYLISTS>')
+    result = list(markers.iter_marker_times(str(path)))
+    assert [name for name, time in result] == ["", "", "", "", "Drop"]
+    np.testing.assert_allclose([time for name, time in result], [0.1, 0.6, 1.1, 2.1, 2.0])
+
+def test_ableton_warp_markers(tmp_path):
+    path = str(tmp_path / "set.als")
+    with gzip.open(path, "wt") as file:
+        file.write('<Ableton><Clip><WarpMarkers><WarpMarker Id="0" SecTime="0.5" BeatTime="0"/>'
+            '<WarpMarker Id="1" SecTime="2.5" BeatTime="4"/></WarpMarkers></Clip></Ableton>')
+    assert [time for name, time in markers.iter_marker_times(path)] == [0.5, 1.0, 1.5, 2.0, 2.5]
+
+def test_rekordbox_track_selection(tmp_path):
+    path = tmp_path / "rekordbox.xml"
+    path.write_text('<?xml version="1.0"?><DJ_PLAYLISTS><COLLECTION>'
+        '<TRACK TrackID="1" Name="Intro" Location="file://localhost/C:/Music/intro.mp3" TotalTime="2">'
+        '<TEMPO Inizio="0" Bpm="60"/></TRACK>'
+        '<TRACK TrackID="2" Name="Main" Location="file://localhost/C:/Music/My%20Song.mp3" TotalTime="1">'
+        '<TEMPO Inizio="0.25" Bpm="120"/></TRACK></COLLECTION>'
+        '<PLAYLISTS><NODE Name="ROOT"><TRACK Key="1"/><TRACK Key="2"/></NODE></PLAYLISTS></DJ_PLAYLISTS>')
+    # the sound file can have another extension than the file in Rekordbox
+    for track in ("My Song.wav", "main"):
+        assert [time for name, time in markers.iter_marker_times(str(path), track)] == [0.25, 0.75]
+    assert [time for name, time in markers.iter_marker_times(str(path), "intro.mp3")] == [0, 1]
+    with pytest.raises(ValueError, match = "Intro, Main"):
+        list(markers.iter_marker_times(str(path), "other.wav"))
+    with pytest.raises(ValueError):
+        list(markers.iter_marker_times(str(path)))
+
+def test_ableton_clip_selection(tmp_path):
+    path = str(tmp_path / "set.als")
+    with gzip.open(path, "wt") as file:
+        file.write('<Ableton><AudioClip><Name Value="Drums"/><SampleRef><FileRef><Path Value="/samples/drums.wav"/></FileRef></SampleRef>'
+            '<WarpMarkers><WarpMarker Id="0" SecTime="0" BeatTime="0"/><WarpMarker Id="1" SecTime="1" BeatTime="2"/></WarpMarkers></AudioClip>'
+            '<AudioClip><Name Value="Bass"/><SampleRef><FileRef><Name Value="bass.aif"/></FileRef></SampleRef>'
+            '<WarpMarkers><WarpMarker Id="0" SecTime="2" BeatTime="0"/><WarpMarker Id="1" SecTime="4" BeatTime="2"/></WarpMarkers></AudioClip></Ableton>')
+    assert [time for name, time in markers.iter_marker_times(path, "drums.wav")] == [0, 0.5, 1]
+    assert [time for name, time in markers.iter_marker_times(path, "bass.wav")] == [2, 3, 4]
+    with pytest.raises(ValueError):
+        list(markers.iter_marker_times(path, "vocals.wav"))
+
+# keeps a frame when it is further than the tolerance from all kept frames
+def merge_reference(existing_frames, new_frames, tolerance):
+    kept = []
+    kept_frames = list(existing_frames)
+    for index in sorted(range(len(new_frames)), key = lambda index: new_frames[index]):
+        if all(abs(new_frames[index] - frame) > tolerance for frame in kept_frames):
+            kept.append(index)
+            kept_frames.append(new_frames[index])
+    return kept
+
+def test_merge_matches_reference():
+    random = np.random.RandomState(3)
+    for i in range(200):
+        existing_frames = np.round(random.uniform(0, 50, random.randint(0, 10)), 2)
+        new_frames = np.round(random.uniform(0, 50, random.randint(0, 30)), 2)
+        tolerance = random.choice([0, 0.5, 2])
+        result = markers.get_frames_to_merge(existing_frames, new_frames, tolerance).tolist()
+        assert result == merge_reference(existing_frames.tolist(), new_frames.tolist(), tolerance)
+
+def test_import_time(tmp_path):
+    path = str(tmp_path / "beats.csv")
+    with open(path, "w") as file:
+        file.write("time\n")
+        file.writelines("{:.6f}\n".format(i * 0.05) for i in range(100000))
+    start = time.perf_counter()
+    times = [time for name, time in markers.iter_marker_times(path)]
+    indices = markers.get_frames_to_merge(np.arange(0, 120000, 7), np.array(times) * 24, 0.5)
+    assert time.perf_counter() - start < 1
+    assert len(times) == 100000
+    assert 0 < len(indices) < len(times)
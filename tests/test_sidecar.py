@@ -0,0 +1,51 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+import os
+import numpy as np
+from audio_to_markers import sidecar
+
+def test_write_and_open_sidecar(tmp_path):
+    path = str(tmp_path / "envelopes.atmenv")
+    values = np.arange(20, dtype = np.float32).reshape(2, 10)
+    sidecar.write_sidecar(path, values, 24, {"bands" : [[0, 100], [100, 200]]})
+    data = sidecar.open_sidecar(path)
+    assert data.bands == [(0, 100), (100, 200)]
+    assert data.rate == 24
+    assert np.array_equal(data.values, values)
+
+def test_rewrite_keeps_mapped_values(tmp_path):
+    path = str(tmp_path / "envelopes.atmenv")
+    values = np.ones((1, 1000), dtype = np.float32)
+    sidecar.write_sidecar(path, values, 24, {})
+    old_values = sidecar.open_sidecar(path).values
+    sidecar.write_sidecar(path, values[:, :10] * 2, 24, {})
+    # the old mapping still reads the old file
+    assert np.array_equal(old_values, values)
+    assert np.array_equal(sidecar.open_sidecar(path).values, values[:, :10] * 2)
+    assert os.listdir(str(tmp_path)) == ["envelopes.atmenv"]
+
+def test_cached_values_are_written_once(tmp_path):
+    values = [np.linspace(0, 1, 50)]
+    name = sidecar.write_cached_values(str(tmp_path), values, 24, {"source" : "music.wav"})
+    assert sidecar.write_cached_values(str(tmp_path), values, 24, {"source" : "music.wav"}) == name
+    assert sidecar.remove_unused_cached_files(str(tmp_path), {name}) == 0
+    assert sidecar.remove_unused_cached_files(str(tmp_path), set()) == 1
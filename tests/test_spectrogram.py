@@ -0,0 +1,52 @@
+'''
+Copyright (C) 2014 Jacques Lucke
+mail@jlucke.com
+
+Created by Jacques Lucke
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+import time
+import wave
+import numpy as np
+from audio_to_markers import spectrogram
+
+def wait_for_spectrogram(path, rate):
+    for i in range(500):
+        data = spectrogram.get_spectrogram(path, rate)
+        if data is not None or spectrogram.get_error(path, rate) is not None: return data
+        time.sleep(0.01)
+    raise TimeoutError()
+
+def test_spectrogram_levels(tmp_path):
+    path = str(tmp_path / "noise.wav")
+    with wave.open(path, "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(8000)
+        file.writeframes((np.random.RandomState(2).uniform(-0.5, 0.5, 8000 * 30) * 2 ** 15).astype("<i2").tobytes())
+    data = wait_for_spectrogram(path, 24000 / 1001)
+    assert len(data.levels[0]) == 720
+    assert data.levels[0].shape[1] == spectrogram.band_amount
+    assert [len(level) for level in data.levels] == [720, 360, 180]
+    assert spectrogram.get_error(path, 24000 / 1001) is None
+
+def test_spectrogram_error(tmp_path):
+    path = str(tmp_path / "music.mp3")
+    with open(path, "wb") as file:
+        file.write(b"not a sound")
+    assert wait_for_spectrogram(path, 24) is None
+    assert "music.mp3" in spectrogram.get_error(path, 24)